@@ -0,0 +1,56 @@
+'''This module pauses a crawl while the GitHub API keeps failing:
+1. Counts consecutive failed requests (timeouts, connection errors, 5xx and secondary rate limits).
+2. Opens after a threshold of consecutive failures, and every new request waits out the cooldown
+   instead of hammering an API that is down. Dropping those requests would drop candidates.
+3. After the cooldown one probe request is let through (half-open); success closes the breaker, failure reopens it.
+4. Counts how often the breaker tripped and how long requests were held back.'''
+
+import asyncio
+import time
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 10, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.probe_started = 0.0
+        self.trips = 0
+        self.wait_time = 0.0
+
+    async def wait_until_closed(self):
+        while True:
+            now = time.monotonic()
+            if self.probing and now - self.probe_started > self.cooldown:
+                # The probe never reported back (it was cancelled or rate limited), so let another one through.
+                self.probing = False
+            if now >= self.open_until and not self.probing:
+                if self.open_until:
+                    # Half-open: this caller is the probe, everyone else waits for its outcome.
+                    self.probing = True
+                    self.probe_started = now
+                return
+            wait = max(self.open_until - now, 0.1)
+            self.wait_time += wait
+            await asyncio.sleep(wait)
+
+    def release_probe(self):
+        self.probing = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        now = time.monotonic()
+        if now < self.open_until:
+            # Requests sent before the breaker opened are still failing; they do not reopen it.
+            return
+        if self.probing or self.consecutive_failures >= self.failure_threshold:
+            self.trips += 1
+            print(f"Circuit breaker opened after {self.consecutive_failures} consecutive failures; pausing {self.cooldown:.0f}s")
+            self.open_until = now + self.cooldown
+            self.probing = False
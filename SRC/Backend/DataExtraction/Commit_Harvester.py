@@ -0,0 +1,186 @@
+'''This script harvests the commit history the commit analysis scores, for every candidate of an extraction output:
+1. Reads the candidate usernames from an output of GitHub_Data_Fetch.py (CSV, Parquet or Arrow IPC).
+2. Lists each candidate's repositories and pages through the commits they authored in all repositories at once,
+   requesting further pages only while the candidate is below the per-user commit cap, and keeps the newest commits.
+3. Optionally fetches every kept commit to record the extensions of the files it touched.
+4. Reuses GitHubUserExtractor for requests: the token pool, response cache, retries, circuit breaker,
+   keep-alive session and projected decoding are the same as in the profile crawl.
+5. Writes one row per commit (username, repo, sha, committed_at, commit_message, file_extensions) to a single
+   Parquet or Arrow IPC store, instead of one CSV file per candidate, and with --resume skips candidates already in it.
+
+Harvest the candidates of an extraction run:
+    python Commit_Harvester.py --candidates users_with_details.csv --output commit_store.parquet --max-commits 200'''
+
+import aiohttp
+import argparse
+import asyncio
+import os
+import pyarrow as pa
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from GitHub_Data_Fetch import GitHubUserExtractor
+from Output_Writers import open_row_writer, read_usernames
+from Response_Cache import ResponseCache
+from Session_Config import SessionConfig
+from Token_Pool import TokenPool
+
+class CommitHarvester(GitHubUserExtractor):
+    COMMIT_FIELDS = ["username", "repo", "sha", "committed_at", "commit_message", "file_extensions"]
+    COMMIT_SCHEMA = pa.schema([
+        ("username", pa.string()), ("repo", pa.string()), ("sha", pa.string()),
+        ("committed_at", pa.timestamp("ms", tz="UTC")), ("commit_message", pa.string()), ("file_extensions", pa.list_(pa.string()))
+    ])
+    COMMITS_PER_PAGE = 100
+    REPOS_PER_PAGE = 100
+
+    def __init__(self, tokens: List[str], max_concurrency: int = 10, repo_concurrency: int = 8, api_url: str = "https://api.github.com",
+                 cache: Optional[ResponseCache] = None, output_path: Optional[str] = None, max_commits_per_user: int = 200,
+                 with_files: bool = True, resume: bool = False, session_config: Optional[SessionConfig] = None,
+                 token_pool: Optional[TokenPool] = None):
+        super().__init__(tokens, "", 0, max_concurrency, repo_concurrency, api_url=api_url, cache=cache, output_path=output_path,
+                         resume=resume, session_config=session_config, token_pool=token_pool)
+        self.max_commits_per_user = max_commits_per_user
+        self.with_files = with_files
+        self.commits_written = 0
+
+    async def fetch_commit_page(self, session: aiohttp.ClientSession, username: str, repo_name: str, page: int,
+                                per_page: int) -> Tuple[List[Dict], bool]:
+        url = f"{self.api_url}/repos/{username}/{repo_name}/commits"
+        status, commits, headers = await self._request(session, url, params={"author": username, "per_page": per_page, "page": page})
+        if status != 200:
+            # 409 is an empty repository; anything else leaves this repository out of the candidate's history.
+            if status != 409:
+                print(f"Error fetching commits of {username}/{repo_name}: {status}")
+            return [], False
+        return commits, 'rel="next"' in headers.get("Link", "")
+
+    async def get_user_commits(self, session: aiohttp.ClientSession, username: str) -> Optional[List[Dict]]:
+        status, repos = await self._get_json(session, f"{self.api_url}/users/{username}/repos", params={"per_page": self.REPOS_PER_PAGE})
+        if status != 200:
+            print(f"Error fetching repositories of {username}: {status}")
+            return None
+
+        per_page = min(self.COMMITS_PER_PAGE, self.max_commits_per_user)
+        next_pages = {repo.get("name"): 1 for repo in repos if repo.get("name")}
+        commits = []
+        # Each round asks every repository that still has commits for its next page; the cap ends the paging early.
+        while next_pages and len(commits) < self.max_commits_per_user:
+            pages = await asyncio.gather(*(self.fetch_commit_page(session, username, repo_name, page, per_page)
+                                           for repo_name, page in next_pages.items()))
+            following_pages = {}
+            for (repo_name, page), (page_commits, has_next) in zip(next_pages.items(), pages):
+                commits.extend({"repo": repo_name, **commit} for commit in page_commits)
+                if has_next:
+                    following_pages[repo_name] = page + 1
+            next_pages = following_pages
+
+        commits.sort(key=lambda commit: ((commit.get("commit") or {}).get("author") or {}).get("date") or "", reverse=True)
+        return commits[:self.max_commits_per_user]
+
+    async def get_file_extensions(self, session: aiohttp.ClientSession, username: str, repo_name: str, sha: str) -> List[str]:
+        status, commit = await self._get_json(session, f"{self.api_url}/repos/{username}/{repo_name}/commits/{sha}")
+        if status != 200:
+            return []
+        extensions = {os.path.splitext(file.get("filename", ""))[1].lower() for file in commit.get("files") or []}
+        return sorted(extension for extension in extensions if extension)
+
+    @staticmethod
+    def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+        if not timestamp:
+            return None
+        return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+    async def harvest_user(self, session: aiohttp.ClientSession, username: str) -> Optional[List[Dict]]:
+        print(f"\nHarvesting commits of user: {username}")
+        commits = await self.get_user_commits(session, username)
+        if commits is None:
+            return None
+        extensions = [[] for _ in commits]
+        if self.with_files:
+            extensions = await asyncio.gather(*(self.get_file_extensions(session, username, commit["repo"], commit.get("sha"))
+                                                for commit in commits))
+        rows = []
+        for commit, file_extensions in zip(commits, extensions):
+            detail = commit.get("commit") or {}
+            rows.append({
+                "username": username,
+                "repo": commit["repo"],
+                "sha": commit.get("sha"),
+                "committed_at": self.parse_timestamp((detail.get("author") or {}).get("date")),
+                "commit_message": detail.get("message", ""),
+                "file_extensions": file_extensions
+            })
+        print(f"Harvested {len(rows)} commits of user: {username}")
+        return rows
+
+    async def harvest(self, usernames: List[str]) -> int:
+        start_time = time.perf_counter()
+        usernames = list(dict.fromkeys(usernames))
+        if self.resume and self.output_path:
+            harvested = set(read_usernames(self.output_path))
+            usernames = [username for username in usernames if username not in harvested]
+            print(f"Skipping {len(harvested)} users already in {self.output_path}")
+        writer = open_row_writer(self.output_path, self.COMMIT_FIELDS, self.COMMIT_SCHEMA, append=self.resume,
+                                 row_group_size=self.max_commits_per_user * 10)
+
+        async def harvest_and_write(session: aiohttp.ClientSession, username: str) -> bool:
+            rows = await self.harvest_user(session, username)
+            # Rows are written as each user finishes; the writer turns them into row groups.
+            for row in rows or []:
+                writer.write_row(row)
+            self.commits_written += len(rows or [])
+            return rows is not None
+
+        try:
+            async with self.session_config.open_session() as session:
+                results = await asyncio.gather(*(harvest_and_write(session, username) for username in usernames))
+        finally:
+            writer.close()
+            if self.owns_session_config:
+                await self.session_config.close()
+
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+        print(f"\nHarvested {self.commits_written} commits of {sum(results)} of {len(usernames)} users to {self.output_path} "
+              f"with {self.request_count} requests in {elapsed:.1f}s ({self.commits_written / elapsed:.0f} commits/sec)")
+        print("Requests by endpoint: " + ", ".join(f"{endpoint}={count}" for endpoint, count in sorted(self.request_counts.items())))
+        self.session_config.metrics.report()
+        self.decoder.report()
+        if self.cache:
+            self.cache.report()
+        self.token_pool.report()
+        return self.commits_written
+
+async def main(tokens: List[str], candidates_path: str, output_path: str, max_commits: int, with_files: bool, resume: bool):
+    cache = ResponseCache(CACHE_PATH, CACHE_TTLS, CACHE_MAX_BYTES)
+    harvester = CommitHarvester(tokens, MAX_CONCURRENCY, REPO_CONCURRENCY, cache=cache, output_path=output_path,
+                                max_commits_per_user=max_commits, with_files=with_files, resume=resume, session_config=SESSION_CONFIG)
+    await harvester.harvest(read_usernames(candidates_path))
+    cache.close()
+    await SESSION_CONFIG.close()
+
+
+GITHUB_TOKENS = []
+
+MAX_CONCURRENCY = 10
+REPO_CONCURRENCY = 8
+MAX_COMMITS_PER_USER = 200
+SESSION_CONFIG = SessionConfig(limit=100, limit_per_host=MAX_CONCURRENCY, keepalive_timeout=30.0, dns_cache_ttl=300,
+                               compress=True, total_timeout=30.0, connect_timeout=10.0, read_timeout=20.0)
+CACHE_PATH = "github_cache.sqlite"
+CACHE_TTLS = {}
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+CANDIDATES_PATH = "/home/ashwin_jayan/EXTRACT/final_data.csv"
+# One columnar store replaces the per-user files of combined_commit_message/.
+OUTPUT_PATH = "/home/ashwin_jayan/EXTRACT/commit_store.parquet"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harvest the commit messages and touched file types of extracted candidates.")
+    parser.add_argument("--candidates", default=CANDIDATES_PATH, help="Extraction output with a username column.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Commit store to write, .parquet or .arrows.")
+    parser.add_argument("--max-commits", type=int, default=MAX_COMMITS_PER_USER, help="Newest commits kept per candidate.")
+    parser.add_argument("--no-files", action="store_true", help="Skip the per-commit request for touched file extensions.")
+    parser.add_argument("--resume", action="store_true", help="Skip candidates already in the store and append to it.")
+    args = parser.parse_args()
+    asyncio.run(main(GITHUB_TOKENS, args.candidates, args.output, args.max_commits, not args.no_files, args.resume))
@@ -0,0 +1,62 @@
+'''This module journals crawl progress so an interrupted extraction can resume:
+1. Appends one JSON line per completed search page (a page number, or shard query and page), with the usernames it returned.
+2. Appends one JSON line per finished user as soon as the user completes, whether or not its row has reached the output yet.
+   A user is finished once it has a row or was rejected by the pre-filters; a user whose fetch failed is not journaled,
+   so a resumed crawl tries it again.
+3. Flushes every line immediately, so a crash loses at most the users that were still in flight.
+4. On resume, reloads the journal and reports which pages and users can be skipped.
+5. Forgets users whose row was journaled but never reached the output, which happens when the row still waited
+   for an earlier user or sat in a columnar writer's unwritten batch at the time of the crash.'''
+
+import json
+import os
+from typing import Dict, List, Optional, Union
+
+class CrawlCheckpoint:
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.pages: Dict[Union[int, str], List[str]] = {}
+        self.finished_users: Dict[str, bool] = {}
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    # A crash can leave a half-written last line behind.
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if "page" in entry:
+                        self.pages[entry["page"]] = entry["usernames"]
+                    elif "user" in entry:
+                        self.finished_users[entry["user"]] = entry.get("added", True)
+            print(f"Resuming from {path}: {len(self.pages)} pages and {len(self.finished_users)} users already done")
+        self.file = open(path, mode="a" if resume else "w", encoding="utf-8")
+
+    def _append(self, entry: Dict):
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def page_usernames(self, page: Union[int, str]) -> Optional[List[str]]:
+        return self.pages.get(page)
+
+    def mark_page(self, page: Union[int, str], usernames: List[str]):
+        self.pages[page] = usernames
+        self._append({"page": page, "usernames": usernames})
+
+    def is_finished(self, username: str) -> bool:
+        return username in self.finished_users
+
+    def mark_user(self, username: str, added: bool):
+        self.finished_users[username] = added
+        self._append({"user": username, "added": added})
+
+    def forget_unwritten(self, written_usernames: List[str]):
+        written = set(written_usernames)
+        unwritten = [username for username, added in self.finished_users.items() if added and username not in written]
+        for username in unwritten:
+            del self.finished_users[username]
+        if unwritten:
+            print(f"{len(unwritten)} finished users are missing from the output and will be crawled again")
+
+    def close(self):
+        self.file.close()
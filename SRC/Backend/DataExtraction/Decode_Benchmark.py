@@ -0,0 +1,107 @@
+'''This script measures the CPU cost of decoding recorded GitHub response pages:
+1. Reads a fixture file recorded by Extraction_Benchmark.py (or records one by crawling the synthetic Fake_GitHub_Server
+   through the recording proxy), and groups the successful REST response bodies by endpoint class.
+2. Decodes every page with json.loads (the previous decoder), with orjson.loads when installed,
+   and with the projected PayloadDecoder, repeating each pass and keeping the fastest one.
+3. Reports, per endpoint class, the pages, average page size, microseconds per page for each decoder,
+   the speedup of the projected decoder and the memory the decoded pages keep alive.
+
+Record synthetic payloads once, then compare the decoders as often as needed:
+    python Decode_Benchmark.py --record-fake --users 120 --fixtures decode_fixtures.json
+    python Decode_Benchmark.py --fixtures decode_fixtures.json --repeat 5'''
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from Extraction_Benchmark import FixtureServer
+from Fake_GitHub_Server import FakeGitHubServer
+from GitHub_Data_Fetch import GitHubUserExtractor
+from Payload_Decoder import PayloadDecoder, orjson
+
+async def record_fake_fixtures(fixture_path: str, users: int, pages: int):
+    fake_server = FakeGitHubServer(users, latency=0.0)
+    fake_url = await fake_server.start()
+    recorder = FixtureServer(fixture_path, upstream=fake_url)
+    api_url = await recorder.start()
+    try:
+        tokens = [f"fake-token-{index}" for index in range(3)]
+        await GitHubUserExtractor(tokens, "data+science", pages, 10, api_url=api_url).extract_users_with_details()
+    finally:
+        await recorder.stop()
+        await fake_server.stop()
+
+def load_pages(fixture_path: str) -> Dict[str, List[bytes]]:
+    with open(fixture_path, encoding="utf-8") as file:
+        fixtures = json.load(file)
+    pages = defaultdict(list)
+    for key, fixture in fixtures.items():
+        method, _, path = key.partition(" ")
+        # GraphQL posts are decoded by the GraphQL extractor and are left out.
+        if method != "GET" or fixture["status"] != 200 or not fixture["body"]:
+            continue
+        pages[GitHubUserExtractor.endpoint_class(path)].append(fixture["body"].encode("utf-8"))
+    return pages
+
+def time_per_page(decode: Callable[[bytes], object], bodies: List[bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.process_time()
+        for body in bodies:
+            decode(body)
+        best = min(best, time.process_time() - start_time)
+    return best / len(bodies) * 1e6
+
+def retained_bytes(decode: Callable[[bytes], object], bodies: List[bytes]) -> int:
+    tracemalloc.start()
+    payloads = [decode(body) for body in bodies]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del payloads
+    return size
+
+def benchmark(pages: Dict[str, List[bytes]], repeat: int):
+    decoders = {"json": json.loads}
+    if orjson:
+        decoders["orjson"] = orjson.loads
+    projected = PayloadDecoder()
+
+    print(f"\n{'endpoint':<10}{'pages':>7}{'KB/page':>9}"
+          + "".join(f"{name + ' us':>12}" for name in decoders)
+          + f"{'projected us':>14}{'speedup':>9}{'json MB':>9}{'proj MB':>9}")
+    totals = defaultdict(float)
+    for endpoint in sorted(pages):
+        bodies = pages[endpoint]
+        project = lambda body, endpoint=endpoint: projected.decode(endpoint, body)
+        timings = {name: time_per_page(decode, bodies, repeat) for name, decode in decoders.items()}
+        timings["projected"] = time_per_page(project, bodies, repeat)
+        for name, timing in timings.items():
+            totals[name] += timing * len(bodies)
+        page_size = sum(len(body) for body in bodies) / len(bodies) / 1024
+        print(f"{endpoint:<10}{len(bodies):>7}{page_size:>9.1f}"
+              + "".join(f"{timings[name]:>12.0f}" for name in decoders)
+              + f"{timings['projected']:>14.0f}{timings['json'] / timings['projected']:>8.1f}x"
+              + f"{retained_bytes(json.loads, bodies) / 2 ** 20:>9.1f}{retained_bytes(project, bodies) / 2 ** 20:>9.1f}")
+
+    page_count = sum(len(bodies) for bodies in pages.values())
+    print(f"\nAll {page_count} pages: " + ", ".join(f"{name} {total / page_count:.0f} us/page" for name, total in totals.items())
+          + f" ({totals['json'] / totals['projected']:.1f}x less CPU than json.loads)")
+    if projected.fallbacks:
+        print(f"{projected.fallbacks} pages did not match their projection and were fully decoded.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full and projected decoding of recorded GitHub response pages.")
+    parser.add_argument("--fixtures", default="decode_fixtures.json", help="Fixture file recorded by Extraction_Benchmark.py.")
+    parser.add_argument("--record-fake", action="store_true", help="Record the fixtures from a crawl of the synthetic fake GitHub server first.")
+    parser.add_argument("--users", type=int, default=120, help="Synthetic users served when recording from the fake server.")
+    parser.add_argument("--pages", type=int, default=2, help="Search pages to crawl when recording from the fake server.")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the pages per decoder; the fastest pass is reported.")
+    args = parser.parse_args()
+
+    if args.record_fake:
+        asyncio.run(record_fake_fixtures(args.fixtures, args.users, args.pages))
+    benchmark(load_pages(args.fixtures), args.repeat)
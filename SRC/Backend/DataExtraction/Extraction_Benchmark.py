@@ -0,0 +1,168 @@
+'''This script benchmarks the REST and GraphQL extraction backends against a local fixture server:
+1. In record mode, runs a local proxy in front of api.github.com and stores every response in a fixture file.
+2. In replay mode, serves the recorded responses from a local aiohttp server with a simulated round-trip latency,
+   so runs are offline and reproducible.
+3. In fake mode, runs the REST extractor against the synthetic Fake_GitHub_Server instead, which needs no recording
+   and scales to any number of users, with optional rate-limit and error injection.
+4. Runs GitHubUserExtractor and GitHubGraphQLExtractor against the server with the same search query.
+5. Reports the number of requests, requests per extracted user, users per second and wall time of each backend.
+   In fake mode the REST extractor also streams its rows to a temporary CSV file, and the report shows when the first row
+   was written, which should be a small fraction of the wall time.
+
+Record once with real tokens, then replay as often as needed:
+    GITHUB_TOKENS=tok1,tok2 python Extraction_Benchmark.py --record --fixtures fixtures.json
+    python Extraction_Benchmark.py --fixtures fixtures.json
+Or load-test against synthetic data:
+    python Extraction_Benchmark.py --fake --users 600 --pages 20 --latency 0.05'''
+
+import aiohttp
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from aiohttp import web
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode
+
+from Fake_GitHub_Server import FakeGitHubServer
+from GitHub_Data_Fetch import GitHubUserExtractor
+from GitHub_GraphQL_Fetch import GitHubGraphQLExtractor
+
+class FixtureServer:
+    # Parameters derived from the current time would never match a recording made on another day.
+    VOLATILE_PARAMS = {"since"}
+    RECORDED_HEADERS = ["Content-Type", "Link", "ETag", "Last-Modified", "Retry-After", "X-RateLimit-Limit",
+                        "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-RateLimit-Resource"]
+
+    def __init__(self, fixture_path: str, upstream: Optional[str] = None, latency: float = 0.0):
+        self.fixture_path = fixture_path
+        self.upstream = upstream
+        self.latency = latency
+        self.fixtures: Dict[str, Dict] = {}
+        if os.path.exists(fixture_path):
+            with open(fixture_path, encoding="utf-8") as file:
+                self.fixtures = json.load(file)
+        self.requests = 0
+        self.misses = 0
+        self.runner = None
+        self.client = None
+
+    @classmethod
+    def fixture_key(cls, method: str, path: str, query_string: str, body: bytes) -> str:
+        params = sorted((key, value) for key, value in parse_qsl(query_string) if key not in cls.VOLATILE_PARAMS)
+        key = f"{method} {path}?{urlencode(params)}"
+        if body:
+            payload = json.loads(body)
+            payload.get("variables", {}).pop("since", None)
+            key += " " + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        return key
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        body = await request.read()
+        key = self.fixture_key(request.method, request.path, request.query_string, body)
+
+        if self.upstream:
+            headers = {name: request.headers[name] for name in ("Accept", "Authorization") if name in request.headers}
+            async with self.client.request(request.method, self.upstream + request.path_qs, headers=headers, data=body or None) as response:
+                self.fixtures[key] = {
+                    "status": response.status,
+                    "headers": {name: response.headers[name] for name in self.RECORDED_HEADERS if name in response.headers},
+                    "body": await response.text()
+                }
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        fixture = self.fixtures.get(key)
+        if fixture is None:
+            self.misses += 1
+            return web.json_response({"message": f"No fixture recorded for {key}"}, status=404)
+        headers = {name: value for name, value in fixture["headers"].items() if name != "Content-Type"}
+        return web.Response(status=fixture["status"], headers=headers, text=fixture["body"], content_type="application/json")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        if self.upstream:
+            self.client = aiohttp.ClientSession()
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+        if self.client:
+            await self.client.close()
+            with open(self.fixture_path, mode="w", encoding="utf-8") as file:
+                json.dump(self.fixtures, file)
+            print(f"Recorded {len(self.fixtures)} fixtures to {self.fixture_path}")
+
+async def run_backend(name: str, extractor: GitHubUserExtractor, server: Union[FixtureServer, FakeGitHubServer]) -> Dict:
+    server_requests = server.requests
+    start_time = time.perf_counter()
+    users = await extractor.extract_users_with_details()
+    elapsed = time.perf_counter() - start_time
+    requests = server.requests - server_requests
+    return {
+        "backend": name,
+        "users": len(users),
+        "requests": requests,
+        "requests_per_user": requests / len(users) if users else 0,
+        "users_per_sec": len(users) / elapsed if elapsed else 0,
+        "wall_time": elapsed,
+        "first_row": extractor.first_row_after
+    }
+
+async def benchmark(tokens: List[str], search_query: str, pages: int, fixture_path: str, record: bool, latency: float,
+                    fake_users: Optional[int] = None, error_rate: float = 0.0, max_concurrency: int = 10):
+    if fake_users:
+        # The fake server has no GraphQL endpoint, so only the REST backend runs against it.
+        server = FakeGitHubServer(fake_users, latency=latency, secondary_rate_limit_rate=error_rate / 3,
+                                  too_many_requests_rate=error_rate / 3, server_error_rate=error_rate / 3)
+        tokens = tokens or [f"fake-token-{index}" for index in range(3)]
+    else:
+        server = FixtureServer(fixture_path, upstream="https://api.github.com" if record else None, latency=0.0 if record else latency)
+    api_url = await server.start()
+    output_dir = tempfile.TemporaryDirectory()
+    try:
+        output_path = os.path.join(output_dir.name, "users.csv") if fake_users else None
+        results = [await run_backend("rest", GitHubUserExtractor(tokens, search_query, pages, max_concurrency, api_url=api_url,
+                                                                 output_path=output_path), server)]
+        if not fake_users:
+            results.append(await run_backend("graphql", GitHubGraphQLExtractor(tokens, search_query, pages, max_concurrency, api_url=api_url), server))
+    finally:
+        await server.stop()
+        output_dir.cleanup()
+
+    print(f"\n{'backend':<10}{'users':>8}{'requests':>10}{'req/user':>10}{'users/sec':>11}{'wall time':>12}{'first row':>12}")
+    for result in results:
+        first_row = f"{result['first_row']:>11.2f}s" if result["first_row"] is not None else f"{'-':>12}"
+        print(f"{result['backend']:<10}{result['users']:>8}{result['requests']:>10}"
+              f"{result['requests_per_user']:>10.2f}{result['users_per_sec']:>11.2f}{result['wall_time']:>11.2f}s{first_row}")
+    if fake_users:
+        server.report()
+    elif server.misses:
+        print(f"{server.misses} requests had no recorded fixture; re-record with --record.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the REST and GraphQL extractors on recorded GitHub responses.")
+    parser.add_argument("--fixtures", default="github_fixtures.json", help="Fixture file to record to or replay from.")
+    parser.add_argument("--record", action="store_true", help="Proxy to api.github.com and record the responses.")
+    parser.add_argument("--query", default="data+science", help="User search query.")
+    parser.add_argument("--pages", type=int, default=1, help="Search pages to crawl.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated round-trip latency in seconds for replay and fake mode.")
+    parser.add_argument("--fake", action="store_true", help="Run the REST extractor against the synthetic fake GitHub server.")
+    parser.add_argument("--users", type=int, default=300, help="Synthetic users served in fake mode.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake responses that are 403/429/502 failures.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum requests in flight per extractor.")
+    args = parser.parse_args()
+
+    tokens = [token for token in os.environ.get("GITHUB_TOKENS", "").split(",") if token]
+    asyncio.run(benchmark(tokens, args.query, args.pages, args.fixtures, args.record, args.latency,
+                          fake_users=args.users if args.fake else None, error_rate=args.error_rate, max_concurrency=args.concurrency))
@@ -0,0 +1,530 @@
+'''This module runs a local stand-in for the GitHub REST API, so the extractors can be benchmarked and load-tested offline:
+1. Generates a deterministic population of synthetic users from a seed: profiles with and without public emails,
+   organizations and bots, and per user repositories with pull requests, issues, commits and events.
+2. Serves the endpoints GitHub_Data_Fetch.py and Commit_Harvester.py use (user and issue search, users, repositories, pulls,
+   issues with their pull requests, commits, single commits with their files, events)
+   with GitHub's pagination: page/per_page, a per_page cap of 100, Link headers with next/last, the 1000-result
+   search cap, the 300-event window, created:/repos:/followers: search qualifiers and 409 for empty repositories.
+   Served objects carry the full set of URL and metadata fields real GitHub objects have, so decoding costs are realistic.
+3. Keeps a quota per token and resource, sends X-RateLimit-* headers, answers 403 once a quota is spent,
+   and answers If-None-Match with a free 304 like GitHub does.
+4. Injects secondary rate limits (403 with Retry-After), 429s and 502s at configurable rates, and delays every response
+   by a configurable latency with jitter.
+5. Counts requests per endpoint and injected failures, so a benchmark can report requests per user.
+
+Run it on its own and point an extractor's api_url at it:
+    python Fake_GitHub_Server.py --users 500 --latency 0.05 --port 8000'''
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from aiohttp import web
+from typing import Callable, Dict, List, Optional
+
+class FakeGitHubServer:
+    SEARCH_CAP = 1000
+    MAX_PER_PAGE = 100
+    MAX_EVENTS = 300
+    RATE_LIMITS = {"core": 5000, "search": 30}
+    RATE_LIMIT_WINDOWS = {"core": 3600, "search": 60}
+    UNAUTHENTICATED_LIMITS = {"core": 60, "search": 10}
+    PUBLIC_API_URL = "https://api.github.com"
+    ISSUE_BODY = ("Steps to reproduce: run the training script on the sample dataset with the default configuration. "
+                  "Expected the pipeline to finish and write the metrics report; instead it stops with a shape mismatch "
+                  "in the feature encoder. Logs and environment details are attached below.")
+    EVENT_TYPES = ["PushEvent", "PullRequestEvent", "IssueCommentEvent", "PullRequestReviewEvent", "WatchEvent", "CreateEvent"]
+    FILE_PATHS = ["src/model.py", "src/train.py", "notebooks/analysis.ipynb", "README.md", "app/index.html", "app/styles.css",
+                  "app/main.js", "src/Main.java", "pom.xml", "build.gradle", "requirements.txt", "Dockerfile"]
+
+    def __init__(self, users: int = 300, seed: int = 0, latency: float = 0.05, latency_jitter: float = 0.5,
+                 secondary_rate_limit_rate: float = 0.0, too_many_requests_rate: float = 0.0, server_error_rate: float = 0.0,
+                 rate_limits: Optional[Dict[str, int]] = None):
+        self.seed = seed
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.secondary_rate_limit_rate = secondary_rate_limit_rate
+        self.too_many_requests_rate = too_many_requests_rate
+        self.server_error_rate = server_error_rate
+        self.rate_limits = {**self.RATE_LIMITS, **(rate_limits or {})}
+        # Timestamps are relative to today, so since= filters of the extractor see a realistic share of recent activity.
+        self.now = datetime.combine(date.today(), datetime.min.time())
+        self.random = random.Random(seed)
+        self.users = [self.make_user(index) for index in range(users)]
+        self.users_by_login = {user["login"]: user for user in self.users}
+        self.quotas: Dict[tuple, Dict] = {}
+        self.requests = 0
+        self.misses = 0
+        self.request_counts = Counter()
+        self.injected = Counter()
+        self.runner = None
+
+    def rng(self, *key) -> random.Random:
+        # Every object gets its own generator, so the data does not depend on the order requests arrive in.
+        return random.Random("/".join(str(part) for part in (self.seed,) + key))
+
+    def make_user(self, index: int) -> Dict:
+        rng = self.rng("user", index)
+        kind = rng.random()
+        login = f"candidate{index}"
+        if kind < 0.05:
+            login, account_type = f"org{index}", "Organization"
+        elif kind < 0.08:
+            login, account_type = f"builder{index}[bot]", "Bot"
+        else:
+            account_type = "User"
+        created_at = date(2008, 1, 1) + timedelta(days=rng.randrange(6500))
+        return {
+            "login": login,
+            "id": index + 1,
+            "type": account_type,
+            "email": f"{login}@example.com" if rng.random() < 0.6 else None,
+            "html_url": f"https://github.com/{login}",
+            "avatar_url": f"https://avatars.githubusercontent.com/u/{index + 1}",
+            "public_repos": min(int(rng.paretovariate(1.2)) - 1, 60),
+            "followers": int(rng.paretovariate(1.0)) - 1,
+            "created_at": f"{created_at.isoformat()}T00:00:00Z",
+            "updated_at": self.timestamp(self.now - timedelta(days=rng.randrange(400)))
+        }
+
+    @staticmethod
+    def timestamp(moment: datetime) -> str:
+        return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def make_repos(self, user: Dict) -> List[Dict]:
+        repos = []
+        for index in range(user["public_repos"]):
+            rng = self.rng("repo", user["login"], index)
+            pushed_at = self.now - timedelta(days=rng.randrange(900))
+            repos.append({
+                "name": f"project-{index}",
+                "full_name": f"{user['login']}/project-{index}",
+                "stargazers_count": int(rng.paretovariate(1.1)) - 1,
+                "forks_count": int(rng.paretovariate(1.3)) - 1,
+                "open_issues_count": rng.randrange(10),
+                "size": 0 if rng.random() < 0.05 else rng.randrange(50, 50000),
+                "pushed_at": self.timestamp(pushed_at),
+                "updated_at": self.timestamp(pushed_at)
+            })
+        return repos
+
+    def make_pulls(self, login: str, repo: str) -> List[Dict]:
+        rng = self.rng("pulls", login, repo)
+        pulls = []
+        for number in range(rng.randrange(0, 80)):
+            created_at = self.now - timedelta(days=rng.randrange(1, 900))
+            closed_at = created_at + timedelta(hours=rng.randrange(1, 500))
+            pulls.append({
+                "number": number + 1,
+                "state": "closed",
+                "created_at": self.timestamp(created_at),
+                "closed_at": self.timestamp(closed_at),
+                "merged_at": self.timestamp(closed_at) if rng.random() < 0.7 else None
+            })
+        return pulls
+
+    def make_issues(self, login: str, repo: str) -> List[Dict]:
+        rng = self.rng("issues", login, repo)
+        issues = []
+        # A few busy repositories have thousands of issues, enough to make full pagination expensive.
+        count = rng.randrange(1000, 2500) if rng.random() < 0.04 else rng.randrange(0, 120)
+        for number in range(10000, 10000 + count):
+            created_at = self.now - timedelta(days=rng.randrange(1, 900))
+            closed = rng.random() < 0.6
+            issues.append({
+                "number": number,
+                "state": "closed" if closed else "open",
+                "created_at": self.timestamp(created_at),
+                "closed_at": self.timestamp(created_at + timedelta(hours=rng.randrange(1, 2000))) if closed else None
+            })
+        return issues
+
+    def make_commits(self, login: str, repo: Dict) -> List[Dict]:
+        if repo["size"] == 0:
+            return []
+        rng = self.rng("commits", login, repo["name"])
+        pushed_at = datetime.strptime(repo["pushed_at"], "%Y-%m-%dT%H:%M:%SZ")
+        commits = []
+        for index in range(rng.randrange(1, 400)):
+            authored_at = pushed_at - timedelta(hours=rng.randrange(0, 30000))
+            commits.append({
+                "sha": hashlib.sha1(f"{login}/{repo['name']}/{index}".encode()).hexdigest(),
+                "commit": {
+                    "message": rng.choice(["Fix data pipeline", "Add model training script", "Update README",
+                                           "Refactor API handler", "Tune hyperparameters", "Add unit tests"]),
+                    "author": {"name": login, "date": self.timestamp(authored_at)}
+                }
+            })
+        commits.sort(key=lambda commit: commit["commit"]["author"]["date"], reverse=True)
+        return commits
+
+    def make_events(self, user: Dict) -> List[Dict]:
+        rng = self.rng("events", user["login"])
+        repos = [f"{user['login']}/project-{index}" for index in range(user["public_repos"])] + \
+                [f"upstream{index}/library" for index in range(rng.randrange(1, 8))]
+        return [{
+            "type": rng.choice(self.EVENT_TYPES),
+            "repo": {"name": rng.choice(repos)},
+            "created_at": self.timestamp(self.now - timedelta(hours=index * 7))
+        } for index in range(rng.randrange(0, 400))]
+
+    def simple_user(self, login: str, user_id: int) -> Dict:
+        url = f"{self.PUBLIC_API_URL}/users/{login}"
+        return {
+            "login": login, "id": user_id, "node_id": f"MDQ6VXNlcj{user_id}", "avatar_url": f"https://avatars.githubusercontent.com/u/{user_id}",
+            "gravatar_id": "", "url": url, "html_url": f"https://github.com/{login}", "followers_url": f"{url}/followers",
+            "following_url": f"{url}/following{{/other_user}}", "gists_url": f"{url}/gists{{/gist_id}}",
+            "starred_url": f"{url}/starred{{/owner}}{{/repo}}", "subscriptions_url": f"{url}/subscriptions",
+            "organizations_url": f"{url}/orgs", "repos_url": f"{url}/repos", "events_url": f"{url}/events{{/privacy}}",
+            "received_events_url": f"{url}/received_events", "type": "User", "user_view_type": "public", "site_admin": False
+        }
+
+    def expand(self, kind: str, item: Dict, login: str, repo_name: Optional[str] = None) -> Dict:
+        # Real GitHub objects carry dozens of URL and metadata fields the extractors never read;
+        # they are added only to served payloads, so decoding costs on this server match the real API.
+        user_id = self.users_by_login[login]["id"] if login in self.users_by_login else 0
+        if kind == "user":
+            return {**self.simple_user(login, user_id), **item, "name": login.title(), "company": None, "blog": "",
+                    "location": "Berlin", "hireable": None, "bio": "Building data products.", "twitter_username": None,
+                    "public_gists": 0, "following": 3}
+        repo_url = f"{self.PUBLIC_API_URL}/repos/{login}/{repo_name or item.get('name')}"
+        if kind == "repo":
+            fields = {name: f"{repo_url}/{name[:-4]}" for name in (
+                "forks_url", "keys_url", "collaborators_url", "teams_url", "hooks_url", "issue_events_url", "events_url",
+                "assignees_url", "branches_url", "tags_url", "blobs_url", "git_tags_url", "git_refs_url", "trees_url",
+                "statuses_url", "languages_url", "stargazers_url", "contributors_url", "subscribers_url", "subscription_url",
+                "commits_url", "git_commits_url", "comments_url", "issue_comment_url", "contents_url", "compare_url",
+                "merges_url", "archive_url", "downloads_url", "issues_url", "pulls_url", "milestones_url",
+                "notifications_url", "labels_url", "releases_url", "deployments_url")}
+            return {**item, "id": user_id * 1000 + len(item["name"]), "node_id": "R_kgDOH", "private": False,
+                    "owner": self.simple_user(login, user_id), "html_url": f"https://github.com/{login}/{item['name']}",
+                    "description": "Synthetic repository for offline benchmarks", "fork": False, "url": repo_url, **fields,
+                    "created_at": item["pushed_at"], "git_url": f"git://github.com/{login}/{item['name']}.git",
+                    "ssh_url": f"git@github.com:{login}/{item['name']}.git", "clone_url": f"https://github.com/{login}/{item['name']}.git",
+                    "homepage": None, "watchers_count": item["stargazers_count"], "language": "Python", "has_issues": True,
+                    "has_projects": True, "has_downloads": True, "has_wiki": True, "has_pages": False, "archived": False,
+                    "disabled": False, "license": {"key": "mit", "name": "MIT License", "spdx_id": "MIT"},
+                    "topics": ["machine-learning", "data-science"], "visibility": "public", "forks": item["forks_count"],
+                    "open_issues": item["open_issues_count"], "watchers": item["stargazers_count"], "default_branch": "main"}
+        if kind in ("issue", "pull"):
+            number = item["number"]
+            expanded = {**item, "url": f"{repo_url}/issues/{number}", "repository_url": repo_url,
+                        "labels_url": f"{repo_url}/issues/{number}/labels{{/name}}", "comments_url": f"{repo_url}/issues/{number}/comments",
+                        "events_url": f"{repo_url}/issues/{number}/events", "html_url": f"https://github.com/{login}/{repo_name}/issues/{number}",
+                        "id": number * 7919, "node_id": "I_kwDOH", "title": "Pipeline fails on the sample dataset",
+                        "user": self.simple_user(login, user_id), "labels": [{"id": 1, "name": "bug", "color": "d73a4a", "default": True}],
+                        "locked": False, "assignee": None, "assignees": [], "milestone": None, "comments": 2,
+                        "updated_at": item["closed_at"] or item["created_at"], "author_association": "OWNER",
+                        "body": self.ISSUE_BODY, "reactions": {"total_count": 0, "+1": 0, "-1": 0}}
+            if "pull_request" in item:
+                expanded["pull_request"] = {"url": f"{repo_url}/pulls/{number}", "html_url": f"https://github.com/{login}/{repo_name}/pull/{number}",
+                                            "diff_url": f"https://github.com/{login}/{repo_name}/pull/{number}.diff",
+                                            "patch_url": f"https://github.com/{login}/{repo_name}/pull/{number}.patch",
+                                            "merged_at": item["pull_request"]["merged_at"]}
+            return expanded
+        if kind == "commit":
+            author = {"name": login, "email": f"{login}@example.com", "date": item["commit"]["author"]["date"]}
+            return {**item, "node_id": "C_kwDOH", "url": f"{repo_url}/commits/{item['sha']}",
+                    "html_url": f"https://github.com/{login}/{repo_name}/commit/{item['sha']}",
+                    "commit": {**item["commit"], "author": author, "committer": author, "comment_count": 0,
+                               "tree": {"sha": item["sha"], "url": f"{repo_url}/git/trees/{item['sha']}"},
+                               "verification": {"verified": False, "reason": "unsigned", "signature": None, "payload": None}},
+                    "author": self.simple_user(login, user_id), "committer": self.simple_user(login, user_id), "parents": []}
+        if kind == "event":
+            return {**item, "id": str(int(hashlib.sha1(item["created_at"].encode()).hexdigest()[:9], 16)), "actor": self.simple_user(login, user_id),
+                    "repo": {**item["repo"], "url": f"{self.PUBLIC_API_URL}/repos/{item['repo']['name']}"},
+                    "payload": {"ref": "refs/heads/main", "size": 1, "commits": [{"message": "Update training pipeline", "distinct": True}]},
+                    "public": True}
+        return item
+
+    def find_user(self, request: web.Request) -> Dict:
+        user = self.users_by_login.get(request.match_info["username"])
+        if user is None:
+            raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+        return user
+
+    def find_repo(self, request: web.Request) -> Dict:
+        user = self.find_user(request)
+        for repo in self.make_repos(user):
+            if repo["name"] == request.match_info["repo"]:
+                return repo
+        raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+
+    @classmethod
+    def paginate(cls, request: web.Request, items: List, limit: Optional[int] = None,
+                 expand: Optional[Callable[[Dict], Dict]] = None) -> web.Response:
+        per_page = min(int(request.query.get("per_page", 30)), cls.MAX_PER_PAGE)
+        page = max(int(request.query.get("page", 1)), 1)
+        if limit is not None:
+            items = items[:limit]
+        last_page = max((len(items) + per_page - 1) // per_page, 1)
+        links = []
+        if page < last_page:
+            links.append(f'<{request.url.update_query(page=page + 1)}>; rel="next"')
+            links.append(f'<{request.url.update_query(page=last_page)}>; rel="last"')
+        if page > 1:
+            links.append(f'<{request.url.update_query(page=1)}>; rel="first"')
+            links.append(f'<{request.url.update_query(page=page - 1)}>; rel="prev"')
+        headers = {"Link": ", ".join(links)} if links else {}
+        page_items = items[(page - 1) * per_page:page * per_page]
+        if expand:
+            page_items = [expand(item) for item in page_items]
+        return web.json_response(page_items, headers=headers)
+
+    @staticmethod
+    def in_range(value, bounds: str, parse) -> bool:
+        low, _, high = bounds.partition("..")
+        if low and low != "*" and value < parse(low):
+            return False
+        if high and high != "*" and value > parse(high):
+            return False
+        return True
+
+    async def search_users(self, request: web.Request) -> web.Response:
+        users = self.users
+        for term in request.query.get("q", "").split():
+            qualifier, _, bounds = term.partition(":")
+            if qualifier == "created":
+                users = [user for user in users if self.in_range(user["created_at"][:10], bounds, str)]
+            elif qualifier in ("repos", "followers"):
+                field = "public_repos" if qualifier == "repos" else "followers"
+                users = [user for user in users if self.in_range(user[field], bounds, int)]
+        if request.query.get("sort") == "repositories":
+            users = sorted(users, key=lambda user: user["public_repos"], reverse=request.query.get("order", "desc") == "desc")
+        per_page = min(int(request.query.get("per_page", 30)), self.MAX_PER_PAGE)
+        page = max(int(request.query.get("page", 1)), 1)
+        if (page - 1) * per_page >= self.SEARCH_CAP:
+            return web.json_response({"message": "Only the first 1000 search results are available"}, status=422)
+        items = [{"login": user["login"], "id": user["id"], "type": user["type"]}
+                 for user in users[:self.SEARCH_CAP][(page - 1) * per_page:page * per_page]]
+        return web.json_response({"total_count": len(users), "incomplete_results": False, "items": items})
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        return web.json_response(self.expand("user", user, user["login"]))
+
+    async def get_repos(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        return self.paginate(request, self.make_repos(user), expand=lambda repo: self.expand("repo", repo, user["login"]))
+
+    async def get_pulls(self, request: web.Request) -> web.Response:
+        repo = self.find_repo(request)
+        pulls = self.make_pulls(request.match_info["username"], repo["name"])
+        state = request.query.get("state", "open")
+        if state != "all":
+            pulls = [pull for pull in pulls if pull["state"] == state]
+        return self.paginate(request, pulls, expand=lambda pull: self.expand("pull", pull, request.match_info["username"], repo["name"]))
+
+    def make_issue_items(self, login: str, repo: str) -> List[Dict]:
+        # Like GitHub, the issues endpoint lists pull requests as well, marked by a pull_request object.
+        pulls = [{"number": pull["number"], "state": pull["state"], "created_at": pull["created_at"], "closed_at": pull["closed_at"],
+                  "pull_request": {"merged_at": pull["merged_at"]}} for pull in self.make_pulls(login, repo)]
+        return sorted(self.make_issues(login, repo) + pulls, key=lambda item: item["created_at"], reverse=True)
+
+    async def search_issues(self, request: web.Request) -> web.Response:
+        terms = request.query.get("q", "").split()
+        repo_names = [term[5:] for term in terms if term.startswith("repo:")]
+        if not repo_names or "/" not in repo_names[0]:
+            return web.json_response({"message": "Validation Failed"}, status=422)
+        login, repo_name = repo_names[0].split("/", 1)
+        user = self.users_by_login.get(login)
+        if user is None or repo_name not in {repo["name"] for repo in self.make_repos(user)}:
+            return web.json_response({"total_count": 0, "incomplete_results": False, "items": []})
+        items = self.make_issue_items(login, repo_name)
+        if "is:pr" in terms:
+            items = [item for item in items if "pull_request" in item]
+        if "is:issue" in terms:
+            items = [item for item in items if "pull_request" not in item]
+        if "is:merged" in terms:
+            items = [item for item in items if item.get("pull_request", {}).get("merged_at")]
+        for state in ("open", "closed"):
+            if f"is:{state}" in terms:
+                items = [item for item in items if item["state"] == state]
+        per_page = min(int(request.query.get("per_page", 30)), self.MAX_PER_PAGE)
+        page = max(int(request.query.get("page", 1)), 1)
+        return web.json_response({"total_count": len(items), "incomplete_results": False,
+                                  "items": [self.expand("issue", item, login, repo_name)
+                                            for item in items[:self.SEARCH_CAP][(page - 1) * per_page:page * per_page]]})
+
+    async def get_issues(self, request: web.Request) -> web.Response:
+        repo = self.find_repo(request)
+        issues = self.make_issue_items(request.match_info["username"], repo["name"])
+        state = request.query.get("state", "open")
+        if state != "all":
+            issues = [issue for issue in issues if issue["state"] == state]
+        if "since" in request.query:
+            issues = [issue for issue in issues if (issue["closed_at"] or issue["created_at"]) >= request.query["since"]]
+        return self.paginate(request, issues, expand=lambda issue: self.expand("issue", issue, request.match_info["username"], repo["name"]))
+
+    async def get_commits(self, request: web.Request) -> web.Response:
+        repo = self.find_repo(request)
+        commits = self.make_commits(request.match_info["username"], repo)
+        if not commits:
+            return web.json_response({"message": "Git Repository is empty."}, status=409)
+        if "since" in request.query:
+            commits = [commit for commit in commits if commit["commit"]["author"]["date"] >= request.query["since"]]
+        if request.query.get("author", request.match_info["username"]) != request.match_info["username"]:
+            # Every synthetic commit is authored by the repository owner.
+            commits = []
+        return self.paginate(request, commits, expand=lambda commit: self.expand("commit", commit, request.match_info["username"], repo["name"]))
+
+    def make_commit_files(self, login: str, repo: str, sha: str) -> List[Dict]:
+        rng = self.rng("files", login, repo, sha)
+        repo_url = f"{self.PUBLIC_API_URL}/repos/{login}/{repo}"
+        files = []
+        for filename in rng.sample(self.FILE_PATHS, rng.randrange(1, 5)):
+            additions, deletions = rng.randrange(0, 80), rng.randrange(0, 40)
+            files.append({
+                "sha": hashlib.sha1(f"{sha}/{filename}".encode()).hexdigest(), "filename": filename, "status": "modified",
+                "additions": additions, "deletions": deletions, "changes": additions + deletions,
+                "blob_url": f"https://github.com/{login}/{repo}/blob/{sha}/{filename}",
+                "raw_url": f"https://github.com/{login}/{repo}/raw/{sha}/{filename}",
+                "contents_url": f"{repo_url}/contents/{filename}?ref={sha}",
+                "patch": "@@ -1,3 +1,4 @@\n" + "\n".join(f"+line {index}" for index in range(additions % 12))
+            })
+        return files
+
+    async def get_commit(self, request: web.Request) -> web.Response:
+        repo = self.find_repo(request)
+        login = request.match_info["username"]
+        for commit in self.make_commits(login, repo):
+            if commit["sha"] == request.match_info["sha"]:
+                files = self.make_commit_files(login, repo["name"], commit["sha"])
+                stats = {"total": sum(file["changes"] for file in files), "additions": sum(file["additions"] for file in files),
+                         "deletions": sum(file["deletions"] for file in files)}
+                return web.json_response({**self.expand("commit", commit, login, repo["name"]), "stats": stats, "files": files})
+        raise web.HTTPNotFound(text=json.dumps({"message": "No commit found for SHA"}), content_type="application/json")
+
+    async def get_events(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        return self.paginate(request, self.make_events(user), limit=self.MAX_EVENTS,
+                             expand=lambda event: self.expand("event", event, user["login"]))
+
+    def quota(self, token: Optional[str], resource: str) -> Dict:
+        key = (token, resource)
+        now = time.time()
+        quota = self.quotas.get(key)
+        if quota is None or quota["reset"] <= now:
+            limit = self.rate_limits[resource] if token else self.UNAUTHENTICATED_LIMITS[resource]
+            quota = {"limit": limit, "used": 0, "reset": int(now) + self.RATE_LIMIT_WINDOWS[resource]}
+            self.quotas[key] = quota
+        return quota
+
+    @staticmethod
+    def rate_limit_headers(quota: Dict, resource: str) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(quota["limit"]),
+            "X-RateLimit-Remaining": str(max(quota["limit"] - quota["used"], 0)),
+            "X-RateLimit-Reset": str(quota["reset"]),
+            "X-RateLimit-Used": str(quota["used"]),
+            "X-RateLimit-Resource": resource
+        }
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.Response:
+        self.requests += 1
+        path = request.path.strip("/").split("/")
+        endpoint = path[0] if path[0] == "search" else path[3] if path[0] == "repos" and len(path) > 3 else \
+            path[2] if len(path) > 2 else "user"
+        self.request_counts[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (1 + self.random.uniform(-self.latency_jitter, self.latency_jitter)))
+
+        resource = "search" if endpoint == "search" else "core"
+        authorization = request.headers.get("Authorization", "")
+        token = authorization.split(" ", 1)[1] if " " in authorization else None
+        quota = self.quota(token, resource)
+        headers = self.rate_limit_headers(quota, resource)
+        if quota["used"] >= quota["limit"]:
+            self.injected["primary_rate_limit"] += 1
+            return web.json_response({"message": "API rate limit exceeded"}, status=403, headers=headers)
+
+        roll = self.random.random()
+        if roll < self.secondary_rate_limit_rate:
+            self.injected["secondary_rate_limit"] += 1
+            return web.json_response({"message": "You have exceeded a secondary rate limit."}, status=403,
+                                     headers={**headers, "Retry-After": "1"})
+        roll -= self.secondary_rate_limit_rate
+        if roll < self.too_many_requests_rate:
+            self.injected["too_many_requests"] += 1
+            return web.json_response({"message": "Too many requests"}, status=429, headers={**headers, "Retry-After": "1"})
+        roll -= self.too_many_requests_rate
+        if roll < self.server_error_rate:
+            self.injected["server_error"] += 1
+            return web.Response(status=502, text="Bad Gateway")
+
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            response = web.Response(status=e.status, text=e.text, content_type="application/json")
+        if response.status == 200 and response.body is not None:
+            etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+            response.headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                # Like GitHub, a 304 does not count against the quota.
+                response = web.Response(status=304, headers={"ETag": etag})
+        if response.status != 304:
+            quota["used"] += 1
+        response.headers.update(self.rate_limit_headers(quota, resource))
+        return response
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/search/users", self.search_users)
+        app.router.add_get("/search/issues", self.search_issues)
+        app.router.add_get("/users/{username}", self.get_user)
+        app.router.add_get("/users/{username}/repos", self.get_repos)
+        app.router.add_get("/users/{username}/events", self.get_events)
+        app.router.add_get("/repos/{username}/{repo}/pulls", self.get_pulls)
+        app.router.add_get("/repos/{username}/{repo}/issues", self.get_issues)
+        app.router.add_get("/repos/{username}/{repo}/commits", self.get_commits)
+        app.router.add_get("/repos/{username}/{repo}/commits/{sha}", self.get_commit)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def report(self):
+        print("Fake server requests by endpoint: " + ", ".join(f"{endpoint}={count}" for endpoint, count in sorted(self.request_counts.items())))
+        if self.injected:
+            print("Fake server injected failures: " + ", ".join(f"{kind}={count}" for kind, count in sorted(self.injected.items())))
+
+async def serve(server: FakeGitHubServer, host: str, port: int):
+    api_url = await server.start(host, port)
+    print(f"Fake GitHub API with {len(server.users)} users listening on {api_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.report()
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic GitHub REST API for offline extractor runs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--users", type=int, default=300, help="Number of synthetic users.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean response latency in seconds.")
+    parser.add_argument("--secondary-rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a secondary rate limit.")
+    parser.add_argument("--too-many-requests-rate", type=float, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of requests answered with 502.")
+    args = parser.parse_args()
+
+    server = FakeGitHubServer(args.users, args.seed, args.latency, secondary_rate_limit_rate=args.secondary_rate_limit_rate,
+                              too_many_requests_rate=args.too_many_requests_rate, server_error_rate=args.server_error_rate)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -1,204 +1,597 @@
 '''This script extracts GitHub user data and saves it to a CSV file:
-1. Connects to GitHub API using authentication tokens and rotates them when rate limits are reached.  
+1. Connects to GitHub API through a token pool that gives each request the token with the most remaining quota.  
 2. Searches for users based on a query (e.g., "data science") and retrieves profiles.  
+   With SHARD_BY set, the query is split into created:/repos:/followers: shards below the 1000-result search cap,
+   crawled concurrently with 100 results per page, and duplicate usernames are dropped.  
 3. Extracts user details like email, profile URL, avatar, public repositories, and followers.  
-4. Collects repository metrics including stars, forks, commits, pull requests, and issue statistics.  
-5. Gathers contribution data such as the number of contributed repositories and code reviews.  
-6. Filters users to include only those with valid public email addresses.  
-7. Saves the data into a CSV file for further analysis.  
-8. Uses async processing for efficient API requests and data retrieval.'''
+4. Collects repository metrics including stars, forks, commits, pull requests, and issue statistics, querying a user's repositories concurrently.  
+   Commit totals are exact and read from the Link header of a one-item page instead of downloading commit lists.  
+   Issue and merged PR counts are exact: small repositories are paginated in full, large ones are counted with search total_count,
+   whichever costs fewer weighted requests.  
+5. Gathers contribution data such as the number of contributed repositories and code reviews from a single pass over the event stream.  
+6. Filters users to include only those with valid public email addresses, and drops low-signal profiles
+   (organizations, bots, too few repositories or followers for the ROLE) before any repository request.  
+7. Streams each user's row to the output (CSV, or Parquet/Arrow IPC with a fixed schema) as soon as it is ready, keeping search order,
+   and journals finished pages and users so an interrupted crawl can continue with --resume.  
+   Responses are cached on disk and revalidated with ETags, so re-running a query mostly costs 304s.  
+   With --incremental, repositories whose pushed_at and updated_at did not change since the last run are skipped,
+   changed ones re-fetch their issues only if a since= probe finds changes and re-count their commits,
+   and --refresh-known re-reads the previous output instead of searching. The refreshed rows go to a .refresh file
+   that replaces the output only when the crawl completes, and a candidate whose refresh failed keeps its previous row.  
+8. Processes search pages and users concurrently, bounded by a global limit on in-flight requests, and reports throughput.
+   At most user_concurrency users are crawled at a time, taken in search order, so finished rows reach the output
+   and the checkpoint throughout the crawl instead of all users progressing together and finishing at the end.
+9. Retries timeouts, connection errors, 5xx responses and secondary rate limits with exponential backoff and jitter,
+   honouring Retry-After, and pauses behind a circuit breaker while the API keeps failing.
+10. Sends every request through one tuned keep-alive connection pool (SESSION_CONFIG) and reports connection reuse and pool wait time.
+11. Decodes response bodies into only the fields it reads (msgspec structs when installed), instead of full JSON objects.
+12. Collects every issue's timestamps and reduces them once per user with NumPy: mean, median and p90 close time
+    and the average age of open issues, in fractional days. Only the mean is written by default, as the model and database expect;
+    --issue-time-stats appends the median, p90 and open issue age columns to the output.
+13. Imports NumPy and pyarrow only where they are used (the issue-time reduction and columnar outputs),
+    so importing the module costs little more than aiohttp.'''
 
 import aiohttp
+import argparse
 import asyncio
-import csv
+import math
 import os
+import random
 import re
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from multidict import CIMultiDict
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Tuple, Union
+
+from Circuit_Breaker import CircuitBreaker
+from Crawl_Checkpoint import CrawlCheckpoint
+from Output_Writers import OrderedRowWriter, open_row_writer, read_usernames
+from Payload_Decoder import PayloadDecoder
+from Pre_Filters import PreFilterChain
+from Refresh_State import RefreshState
+from Response_Cache import ResponseCache
+from Search_Shard_Planner import SearchShardPlanner
+from Session_Config import SessionConfig
+from Token_Pool import TokenPool
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
 
 class GitHubUserExtractor:
-    def __init__(self, tokens: List[str], search_query: str, pages: int):
+    CONTRIBUTION_EVENT_TYPES = ["PushEvent", "PullRequestEvent", "IssueCommentEvent"]
+    EVENTS_PER_PAGE = 100
+    EVENT_PAGES = 3
+    CSV_FIELDS = [
+        "username", "email", "user_url", "avatar_url", "public_repos", "followers",
+        "total_stars", "total_forks", "total_pr_merged", "total_issues_opened", "total_issues_closed",
+        "total_commits_last_year", "total_commits_all_time", "avg_commits_per_month",
+        "avg_issue_close_time", "contributed_repos", "code_reviews_count"
+    ]
+    # Written only with issue_time_stats: the Candidate table and the trained model's feature lists do not have these columns.
+    ISSUE_TIME_STATS_FIELDS = ["median_issue_close_time", "p90_issue_close_time", "avg_open_issue_age"]
+    # Fixed types for the columnar outputs, by pyarrow type name, so readers never have to infer them.
+    OUTPUT_TYPES = {
+        "username": "string", "email": "string", "user_url": "string", "avatar_url": "string",
+        "public_repos": "int32", "followers": "int32",
+        "total_stars": "int64", "total_forks": "int64", "total_pr_merged": "int32",
+        "total_issues_opened": "int32", "total_issues_closed": "int32",
+        "total_commits_last_year": "int32", "total_commits_all_time": "int64", "avg_commits_per_month": "float64",
+        "avg_issue_close_time": "float64", "median_issue_close_time": "float64", "p90_issue_close_time": "float64",
+        "avg_open_issue_age": "float64", "contributed_repos": "int32", "code_reviews_count": "int32"
+    }
+    ROW_GROUP_SIZE = 500
+    SHARD_PER_PAGE = 100
+    # One issues page and two commit counts: the cheapest full fetch of a repository.
+    REQUESTS_PER_REPO = 3
+    COMMIT_COUNT_REQUESTS = 2
+    ISSUES_PER_PAGE = 100
+    ISSUE_SEARCH_QUALIFIERS = {"pr_merged": "is:pr is:merged", "issues_opened": "is:issue is:open", "issues_closed": "is:issue is:closed"}
+    # A search request is worth about three core requests: 30 per minute against 5000 per hour.
+    SEARCH_REQUEST_WEIGHT = 3
+    # Timestamps are kept per repository and only reduced per user, so percentiles cover all of a user's issues.
+    ISSUE_TIME_FIELDS = ["closed_issue_created_at", "closed_issue_closed_at", "open_issue_created_at"]
+    ISSUE_METRICS = ["pr_merged", "issues_opened", "issues_closed"] + ISSUE_TIME_FIELDS
+    COMMIT_METRICS = ["commits_last_year", "commits_all_time"]
+    RETRY_STATUSES = {500, 502, 503, 504}
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 60.0
+    LAST_PAGE_REGEX = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+    def __init__(self, tokens: List[str], search_query: str, pages: int, max_concurrency: int = 10, repo_concurrency: int = 8,
+                 api_url: str = "https://api.github.com", cache: Optional[ResponseCache] = None,
+                 output_path: Optional[str] = None, checkpoint_path: Optional[str] = None, resume: bool = False,
+                 shard_by: Optional[str] = None, role: Optional[str] = None, prefilter: Optional[PreFilterChain] = None,
+                 max_retries: int = 4, circuit_breaker: Optional[CircuitBreaker] = None, session_config: Optional[SessionConfig] = None,
+                 refresh_state: Optional[RefreshState] = None, refresh_from: Optional[str] = None, token_pool: Optional[TokenPool] = None,
+                 issue_time_stats: bool = False, user_concurrency: int = 20):
         self.tokens = tokens
         self.search_query = search_query
         self.pages = pages
-        self.headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {self.tokens[0]}"
-        }
-        self.current_token_index = 0
+        self.api_url = api_url.rstrip("/")
+        # Extractors crawling several queries in one process share a pool, so quota is tracked once per token.
+        self.token_pool = token_pool or TokenPool(tokens)
+        self.cache = cache
+        self.output_path = output_path
+        self.output_fields = self.CSV_FIELDS + (self.ISSUE_TIME_STATS_FIELDS if issue_time_stats else [])
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+        self.checkpoint: Optional[CrawlCheckpoint] = None
+        self.shard_by = shard_by
+        self.role = role
+        self.prefilter = prefilter or PreFilterChain.for_role(role, self.is_valid_email)
+        self.max_retries = max_retries
+        # A config passed in may be shared with other extractors, so only a config created here is closed after the crawl.
+        self.owns_session_config = session_config is None
+        self.session_config = session_config or SessionConfig(limit_per_host=max(max_concurrency, 1))
+        self.request_timeout = self.session_config.timeout()
+        self.refresh_state = refresh_state
+        self.refresh_from = refresh_from
+        self.refresh_usernames: Optional[List[str]] = None
+        self.refresh_rows: Dict[str, Dict] = {}
+        self.carried_forward = 0
+        self.refresh_stats = Counter()
+        self.issue_strategy_stats = Counter()
+        self.decoder = PayloadDecoder()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_stats = Counter()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Waiters are woken in order, so users start in search order and the ordered writer can keep releasing rows.
+        self.user_semaphore = asyncio.Semaphore(user_concurrency)
+        self.first_row_after: Optional[float] = None
+        self.repo_concurrency = repo_concurrency
+        self.request_count = 0
+        self.request_counts = Counter()
+        self.event_requests_saved = 0
+
+    async def _request(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict] = None,
+                       json_body: Optional[Dict] = None, cost: int = 1) -> Tuple[int, Optional[Any], Dict]:
+        endpoint = self.endpoint_class(url)
+        resource = endpoint if endpoint in ("search", "graphql") else "core"
+        method = "POST" if json_body is not None else "GET"
+
+        cache_key = self.cache.key(url, params) if self.cache and method == "GET" else None
+        cached = self.cache.lookup(cache_key) if cache_key else None
+        if cached and self.cache.is_fresh(cached):
+            return 200, self.decoder.decode(endpoint, cached["body"]), CIMultiDict(cached["headers"])
 
-    async def fetch_users(self, session: aiohttp.ClientSession, page: int) -> Optional[Dict]:
-        url = f"https://api.github.com/search/users?q={self.search_query}&sort=repositories&order=desc&page={page}&per_page=30"
+        attempt = 0
+        while True:
+            await self.circuit_breaker.wait_until_closed()
+            # The token is picked before taking a semaphore slot, so waiting for a rate-limit reset never blocks other requests.
+            token_index = await self.token_pool.acquire(resource, cost)
+            request_headers = {**self.token_pool.headers(token_index), **ResponseCache.conditional_headers(cached)}
+            error = None
+            settled = False
+            try:
+                async with self.semaphore:
+                    self.request_count += 1
+                    self.request_counts[endpoint] += 1
+                    async with session.request(method, url, headers=request_headers, params=params, json=json_body,
+                                               timeout=self.request_timeout) as response:
+                        status = response.status
+                        rate_limited = self.token_pool.update(token_index, resource, response.headers, status, cost)
+                        settled = True
+                        body = await response.read() if status in (200, 403, 429) else None
+                        headers = response.headers.copy()
+                retryable = status in self.RETRY_STATUSES or (not rate_limited and self.is_secondary_rate_limit(status, headers, body))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, headers, body, rate_limited, retryable, error = None, CIMultiDict(), None, False, True, e
+                if isinstance(e, asyncio.TimeoutError):
+                    self.retry_stats["timeouts"] += 1
+            finally:
+                # update() already released the reservation; every other exit, a cancelled task included, releases it once here.
+                if not settled:
+                    self.token_pool.release(token_index, resource, cost)
+
+            if rate_limited:
+                # Primary rate limits are the token pool's job and do not count as failures.
+                self.circuit_breaker.release_probe()
+                continue
+            if not retryable:
+                self.circuit_breaker.record_success()
+                if attempt:
+                    self.retry_stats["recovered"] += 1
+                break
+
+            self.circuit_breaker.record_failure()
+            if attempt >= self.max_retries:
+                self.retry_stats["gave_up"] += 1
+                if error:
+                    raise error
+                break
+            if attempt == 0:
+                self.retry_stats["retried_requests"] += 1
+            self.retry_stats["retries"] += 1
+            delay = self.backoff_delay(attempt, headers)
+            attempt += 1
+            print(f"Retrying {url} in {delay:.1f}s (attempt {attempt}/{self.max_retries}) after {error or status}")
+            await asyncio.sleep(delay)
+
+        if status == 304 and cached:
+            # Conditional hits are free on GitHub, so they do not count towards the token's usage.
+            self.token_pool.refund(token_index, resource, cost)
+            self.cache.mark_revalidated(cache_key)
+            return 200, self.decoder.decode(endpoint, cached["body"]), CIMultiDict(cached["headers"])
+        if status == 200 and cache_key:
+            self.cache.store(cache_key, endpoint, headers, body)
+        return status, self.decoder.decode(endpoint, body) if status == 200 and body else None, headers
+
+    def is_secondary_rate_limit(self, status: int, headers, body: Optional[bytes]) -> bool:
+        if status not in (403, 429):
+            return False
+        if status == 429 or "Retry-After" in headers:
+            self.retry_stats["secondary_rate_limits"] += 1
+            return True
+        if body and b"secondary rate limit" in body.lower():
+            self.retry_stats["secondary_rate_limits"] += 1
+            return True
+        return False
+
+    def backoff_delay(self, attempt: int, headers) -> float:
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Full jitter spreads the retries of concurrent requests instead of sending them back in lockstep.
+        return random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt))
+
+    async def _get_json(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict] = None) -> Tuple[int, Optional[Any]]:
+        status, payload, _ = await self._request(session, url, params=params)
+        return status, payload
+
+    async def count_items(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict] = None) -> Tuple[int, int]:
+        # With one item per page, the page number of the rel="last" link is the total count.
+        status, items, headers = await self._request(session, url, params={**(params or {}), "per_page": 1})
+        if status == 409:
+            # GitHub answers 409 for the commits of an empty repository.
+            return 200, 0
+        if status != 200:
+            return status, 0
+        last_page = self.LAST_PAGE_REGEX.search(headers.get("Link", ""))
+        if last_page:
+            return status, int(last_page.group(1))
+        return status, len(items)
+
+    @staticmethod
+    def build_schema(fields: List[str], types: Dict[str, str]) -> "pa.Schema":
+        import pyarrow as pa
+
+        # Built when a columnar output is opened, so importing the extractor or writing CSV never loads pyarrow.
+        return pa.schema([(field, getattr(pa, types[field])()) for field in fields])
+
+    def output_schema(self) -> "pa.Schema":
+        return self.build_schema(self.output_fields, self.OUTPUT_TYPES)
+
+    @staticmethod
+    def endpoint_class(url: str) -> str:
+        
+        path = url.split("://", 1)[-1].split("?", 1)[0].split("/")[1:]
+        if path[0] == "search":
+            return "search"
+        if path[0] == "users":
+            return path[2] if len(path) > 2 else "user"
+        if path[0] == "repos" and len(path) > 4 and path[3] == "commits":
+            return "commit"
+        if path[0] == "repos" and len(path) > 3:
+            return path[3]
+        return path[0]
+
+    async def fetch_users(self, session: aiohttp.ClientSession, page: int, query: Optional[str] = None, per_page: int = 30) -> Optional[Dict]:
+        query = query or self.search_query
+        url = f"{self.api_url}/search/users?q={query}&sort=repositories&order=desc&page={page}&per_page={per_page}"
+        print(f"Fetching page {page} of {query}...")
         try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 403: 
-                    print(f"Rate limit exceeded. Rotating token...")
-                    self.rotate_token()
-                    return await self.fetch_users(session, page)
-                else:
-                    print(f"Error fetching page {page}: {response.status}")
-                    return None
+            status, users_data = await self._get_json(session, url)
+            if status == 200:
+                return users_data
+            print(f"Error fetching page {page}: {status}")
+            return None
         except Exception as e:
             print(f"Exception occurred while fetching users: {e}")
             return None
 
-    def rotate_token(self):
-        self.current_token_index = (self.current_token_index + 1) % len(self.tokens)
-        self.headers["Authorization"] = f"Bearer {self.tokens[self.current_token_index]}"
-        print(f"Switched to token index {self.current_token_index}")
-
     async def get_user_details(self, session: aiohttp.ClientSession, username: str) -> Optional[Dict]:
-        url = f"https://api.github.com/users/{username}"
+        url = f"{self.api_url}/users/{username}"
         try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    user_data = await response.json()
-                    return {
-                        "email": user_data.get("email"),
-                        "html_url": user_data.get("html_url"),
-                        "avatar_url": user_data.get("avatar_url"),
-                        "public_repos": user_data.get("public_repos"),
-                        "followers": user_data.get("followers")
-                    }
-                elif response.status == 403:  
-                    print(f"Rate limit exceeded. Rotating token...")
-                    self.rotate_token()
-                    return await self.get_user_details(session, username)
-                else:
-                    print(f"Error fetching details for {username}: {response.status}")
-                    return None
+            status, user_data = await self._get_json(session, url)
+            if status == 200:
+                return {
+                    "email": user_data.get("email"),
+                    "html_url": user_data.get("html_url"),
+                    "avatar_url": user_data.get("avatar_url"),
+                    "public_repos": user_data.get("public_repos"),
+                    "followers": user_data.get("followers"),
+                    "updated_at": user_data.get("updated_at")
+                }
+            print(f"Error fetching details for {username}: {status}")
+            return None
         except Exception as e:
             print(f"Exception occurred while fetching details for {username}: {e}")
             return None
 
-    async def get_repo_metrics(self, session: aiohttp.ClientSession, username: str) -> Optional[Dict]:
-        url = f"https://api.github.com/users/{username}/repos"
+    async def get_single_repo_metrics(self, session: aiohttp.ClientSession, username: str, repo: Dict, user_semaphore: asyncio.Semaphore,
+                                      profile_changed: bool = False) -> Dict:
+        repo_name = repo.get("name")
+        previous, plan = None, "full"
+        if self.refresh_state:
+            previous = self.refresh_state.repo(username, repo_name)
+            plan = self.refresh_state.plan(previous, repo, self.ISSUE_METRICS + self.COMMIT_METRICS, profile_changed)
+            self.refresh_stats[plan] += 1
+            if plan == "skip":
+                self.refresh_stats["requests_saved"] += self.full_fetch_requests(previous)
+                # Stars and forks come with the repository list, so they stay current for a skipped repository too.
+                return {**previous["metrics"], "stars": repo.get("stargazers_count", 0), "forks": repo.get("forks_count", 0)}
+        requests_made = 0
+        issue_requests = 0
+
+        async def limited_request(url: str, params: Optional[Dict] = None) -> Tuple[int, Optional[Any], Dict]:
+            nonlocal requests_made
+            requests_made += 1
+            async with user_semaphore:
+                return await self._request(session, url, params=params)
+
+        async def issue_request(url: str, params: Optional[Dict] = None) -> Tuple[int, Optional[Any], Dict]:
+            nonlocal issue_requests
+            issue_requests += 1
+            return await limited_request(url, params)
+
+        async def limited_get(url: str, params: Optional[Dict] = None) -> Tuple[int, Optional[Any]]:
+            status, payload, _ = await limited_request(url, params)
+            return status, payload
+
+        async def limited_count(url: str, params: Optional[Dict] = None) -> Tuple[int, int]:
+            nonlocal requests_made
+            requests_made += 1
+            async with user_semaphore:
+                return await self.count_items(session, url, params=params)
+
+        
+        commits_url = f"{self.api_url}/repos/{username}/{repo_name}/commits"
+        # Day precision keeps the URL stable within a day, so the response cache can serve it.
+        since_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z")
+
+        metrics = {
+            "stars": repo.get("stargazers_count", 0),
+            "forks": repo.get("forks_count", 0),
+            "pr_merged": 0,
+            "issues_opened": 0,
+            "issues_closed": 0,
+            "commits_last_year": 0,
+            "commits_all_time": 0,
+            "closed_issue_created_at": [],
+            "closed_issue_closed_at": [],
+            "open_issue_created_at": []
+        }
+
+        fetch_issues = True
+        if plan == "incremental":
+            # Issue and pull request activity does not move pushed_at, so ask for anything updated since the last fetch.
+            changed_status, changed = await limited_get(f"{self.api_url}/repos/{username}/{repo_name}/issues",
+                                                        params={"state": "all", "since": previous["refreshed_at"], "per_page": 1})
+            fetch_issues = changed_status != 200 or bool(changed)
+            if not fetch_issues:
+                for field in self.ISSUE_METRICS:
+                    metrics[field] = previous["metrics"][field]
+
+        requests = {}
+        if fetch_issues:
+            requests["issues"] = self.get_issue_metrics(username, repo_name, issue_request)
+        # Each count is a single per_page=1 request, so counting in full costs what a since= delta would,
+        # and stays exact: since= filters on commit date, not push date, and misses rebases and force-pushes.
+        requests["commits_last_year"] = limited_count(commits_url, params={"since": since_date})
+        requests["commits_all_time"] = limited_count(commits_url)
+        responses = dict(zip(requests, await asyncio.gather(*requests.values())))
+
+        if "issues" in responses and responses["issues"][0] == 200:
+            metrics.update(responses["issues"][1])
+
+        if responses["commits_last_year"][0] == 200:
+            metrics["commits_last_year"] = responses["commits_last_year"][1]
+
+        if responses["commits_all_time"][0] == 200:
+            metrics["commits_all_time"] = responses["commits_all_time"][1]
+
+        if self.refresh_state:
+            # What a full fetch of this repository costs: its issue requests (pages or searches) and the two commit counts.
+            # Issues that were not re-fetched cost what the last full fetch of them cost.
+            full_requests = issue_requests + self.COMMIT_COUNT_REQUESTS if fetch_issues else self.full_fetch_requests(previous)
+            if plan == "incremental":
+                # Negative when the since= probe found changes and everything was fetched again anyway.
+                self.refresh_stats["requests_saved"] += full_requests - requests_made
+            # A failed request would store zeros, so such a repository keeps its old state and is planned again next run.
+            if all(status == 200 for status, _ in responses.values()):
+                self.refresh_state.record_repo(username, repo, metrics, self.refresh_state.started_at, full_requests)
+
+        return metrics
+
+    def full_fetch_requests(self, previous: Dict) -> int:
+        # State written before the cost was recorded falls back to the cost of an unpaginated repository.
+        return previous.get("full_requests") or self.REQUESTS_PER_REPO
+
+    @staticmethod
+    def summarize_issues(items: List[Dict]) -> Dict:
+        
+        metrics = {"pr_merged": 0, "issues_opened": 0, "issues_closed": 0,
+                   "closed_issue_created_at": [], "closed_issue_closed_at": [], "open_issue_created_at": []}
+        for item in items:
+            # The issues endpoint lists pull requests too; they carry a pull_request object with their merge time.
+            pull_request = item.get("pull_request")
+            if pull_request is not None:
+                if pull_request.get("merged_at"):
+                    metrics["pr_merged"] += 1
+                continue
+            created_at = item.get("created_at")
+            if item.get("state") == "open":
+                metrics["issues_opened"] += 1
+                if created_at:
+                    metrics["open_issue_created_at"].append(created_at)
+            elif item.get("state") == "closed":
+                metrics["issues_closed"] += 1
+                closed_at = item.get("closed_at")
+                if created_at and closed_at:
+                    metrics["closed_issue_created_at"].append(created_at)
+                    metrics["closed_issue_closed_at"].append(closed_at)
+        return metrics
+
+    @staticmethod
+    def to_datetime64(timestamps: List[str]) -> "np.ndarray":
+        import numpy as np
+
+        # Truncating to 19 characters drops the trailing Z, which NumPy would warn about; GitHub times are all UTC.
+        return np.array(timestamps, dtype="U19").astype("datetime64[s]")
+
+    @classmethod
+    def issue_time_stats(cls, closed_issue_created_at: List[str], closed_issue_closed_at: List[str],
+                         open_issue_created_at: List[str], now: Optional[datetime] = None) -> Dict:
+        import numpy as np
+
+        seconds_per_day = 86400.0
+        stats = {"avg_issue_close_time": 0.0, "median_issue_close_time": 0.0, "p90_issue_close_time": 0.0, "avg_open_issue_age": 0.0}
+        if closed_issue_created_at:
+            close_times = (cls.to_datetime64(closed_issue_closed_at) - cls.to_datetime64(closed_issue_created_at)).astype(np.float64) / seconds_per_day
+            median, p90 = np.percentile(close_times, [50, 90])
+            stats.update(avg_issue_close_time=float(close_times.mean()), median_issue_close_time=float(median), p90_issue_close_time=float(p90))
+        if open_issue_created_at:
+            now = np.datetime64(now or datetime.now(timezone.utc).replace(tzinfo=None), "s")
+            open_ages = (now - cls.to_datetime64(open_issue_created_at)).astype(np.float64) / seconds_per_day
+            stats["avg_open_issue_age"] = float(open_ages.mean())
+        return stats
+
+    async def get_issue_metrics(self, username: str, repo_name: str, limited_request) -> Tuple[int, Optional[Dict]]:
+        url = f"{self.api_url}/repos/{username}/{repo_name}/issues"
+        params = {"state": "all", "per_page": self.ISSUES_PER_PAGE}
+        status, first_page, headers = await limited_request(url, params)
+        if status != 200:
+            return status, None
+        last_page = self.LAST_PAGE_REGEX.search(headers.get("Link", ""))
+        pages = int(last_page.group(1)) if last_page else 1
+
+        # Paginating costs one core request per remaining page; search costs one request per count, weighted by its smaller quota.
+        search_cost = len(self.ISSUE_SEARCH_QUALIFIERS) * self.SEARCH_REQUEST_WEIGHT
+        if pages - 1 <= search_cost:
+            rest = await asyncio.gather(*(limited_request(url, {**params, "page": page}) for page in range(2, pages + 1)))
+            for page_status, _, _ in rest:
+                if page_status != 200:
+                    return page_status, None
+            self.issue_strategy_stats["paginated_repos"] += 1
+            self.issue_strategy_stats["paginated_pages"] += pages
+            return 200, self.summarize_issues(first_page + [item for _, page_items, _ in rest for item in page_items])
+
+        search_url = f"{self.api_url}/search/issues"
+        results = await asyncio.gather(*(limited_request(search_url, {"q": f"repo:{username}/{repo_name} {qualifier}", "per_page": 1})
+                                         for qualifier in self.ISSUE_SEARCH_QUALIFIERS.values()))
+        for search_status, _, _ in results:
+            if search_status != 200:
+                return search_status, None
+        print(f"{username}/{repo_name}: {pages} issue pages cost more than {len(results)} search requests (weighted {search_cost}); "
+              f"counting with search and sampling close times from the latest {self.ISSUES_PER_PAGE} issues")
+        self.issue_strategy_stats["searched_repos"] += 1
+        self.issue_strategy_stats["search_requests"] += len(results)
+        self.issue_strategy_stats["pages_avoided"] += pages - 1
+        # Counts are exact; close times and open-issue ages are sampled from the issues of the first page.
+        metrics = self.summarize_issues(first_page)
+        for field, (_, result, _) in zip(self.ISSUE_SEARCH_QUALIFIERS, results):
+            metrics[field] = result.get("total_count", 0)
+        return 200, metrics
+
+    async def get_repo_metrics(self, session: aiohttp.ClientSession, username: str, profile_changed: bool = False) -> Optional[Dict]:
+        url = f"{self.api_url}/users/{username}/repos"
         try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    repos = await response.json()
-                    total_stars = 0
-                    total_forks = 0
-                    total_pr_merged = 0
-                    total_issues_opened = 0
-                    total_issues_closed = 0
-                    total_commits_last_year = 0
-                    total_commits_all_time = 0
-                    total_issue_close_time = 0
-                    total_issues_with_close_time = 0
-
-                    for repo in repos:
-                        repo_name = repo.get("name")
-                        total_stars += repo.get("stargazers_count", 0)
-                        total_forks += repo.get("forks_count", 0)
-
-                        
-                        prs_url = f"https://api.github.com/repos/{username}/{repo_name}/pulls?state=closed"
-                        issues_url = f"https://api.github.com/repos/{username}/{repo_name}/issues?state=all"
-
-                        async with session.get(prs_url, headers=self.headers) as prs_response:
-                            if prs_response.status == 200:
-                                prs = await prs_response.json()
-                                total_pr_merged += len([pr for pr in prs if pr.get("merged_at")])
-
-                        async with session.get(issues_url, headers=self.headers) as issues_response:
-                            if issues_response.status == 200:
-                                issues = await issues_response.json()
-                                for issue in issues:
-                                    if issue.get("state") == "open":
-                                        total_issues_opened += 1
-                                    elif issue.get("state") == "closed":
-                                        total_issues_closed += 1
-                                        created_at = issue.get("created_at")
-                                        closed_at = issue.get("closed_at")
-                                        if created_at and closed_at:
-                                            created = datetime.fromisoformat(created_at[:-1])  
-                                            closed = datetime.fromisoformat(closed_at[:-1])
-                                            total_issue_close_time += (closed - created).days
-                                            total_issues_with_close_time += 1
-
-                        
-                        commits_url = f"https://api.github.com/repos/{username}/{repo_name}/commits"
-                        since_date = (datetime.now() - timedelta(days=365)).isoformat()
-                        params = {"since": since_date}
-                        async with session.get(commits_url, headers=self.headers, params=params) as commits_response:
-                            if commits_response.status == 200:
-                                commits = await commits_response.json()
-                                total_commits_last_year += len(commits)
-
-                        
-                        async with session.get(commits_url, headers=self.headers) as all_commits_response:
-                            if all_commits_response.status == 200:
-                                all_commits = await all_commits_response.json()
-                                total_commits_all_time += len(all_commits)
-
-                    
-                    avg_commits_per_month = (total_commits_last_year / 12) if total_commits_last_year > 0 else 0
-
-                    
-                    avg_issue_close_time = (total_issue_close_time / total_issues_with_close_time) if total_issues_with_close_time > 0 else 0
-
-                    return {
-                        "total_stars": total_stars,
-                        "total_forks": total_forks,
-                        "total_pr_merged": total_pr_merged,
-                        "total_issues_opened": total_issues_opened,
-                        "total_issues_closed": total_issues_closed,
-                        "total_commits_last_year": total_commits_last_year,
-                        "total_commits_all_time": total_commits_all_time,
-                        "avg_commits_per_month": avg_commits_per_month,
-                        "avg_issue_close_time": avg_issue_close_time
-                    }
-                elif response.status == 403:  
-                    print(f"Rate limit exceeded. Rotating token...")
-                    self.rotate_token()
-                    return await self.get_repo_metrics(session, username)
-                else:
-                    print(f"Error fetching repo metrics for {username}: {response.status}")
-                    return None
+            status, repos = await self._get_json(session, url)
+            if status != 200:
+                print(f"Error fetching repo metrics for {username}: {status}")
+                return None
+
+            total_stars = 0
+            total_forks = 0
+            total_pr_merged = 0
+            total_issues_opened = 0
+            total_issues_closed = 0
+            total_commits_last_year = 0
+            total_commits_all_time = 0
+            issue_times = {field: [] for field in self.ISSUE_TIME_FIELDS}
+
+            # Every repo's sub-requests are in flight together, capped per user here and globally by self.semaphore.
+            user_semaphore = asyncio.Semaphore(self.repo_concurrency)
+            repo_tasks = [asyncio.ensure_future(self.get_single_repo_metrics(session, username, repo, user_semaphore, profile_changed))
+                          for repo in repos]
+            try:
+                for repo_task in asyncio.as_completed(repo_tasks):
+                    metrics = await repo_task
+                    total_stars += metrics["stars"]
+                    total_forks += metrics["forks"]
+                    total_pr_merged += metrics["pr_merged"]
+                    total_issues_opened += metrics["issues_opened"]
+                    total_issues_closed += metrics["issues_closed"]
+                    total_commits_last_year += metrics["commits_last_year"]
+                    total_commits_all_time += metrics["commits_all_time"]
+                    for field in self.ISSUE_TIME_FIELDS:
+                        issue_times[field].extend(metrics[field])
+            finally:
+                # If one repo fails, the user is dropped, so stop that user's remaining requests.
+                for repo_task in repo_tasks:
+                    repo_task.cancel()
+            if self.refresh_state:
+                self.refresh_state.prune_repos(username, [repo.get("name") for repo in repos])
+
+            
+            avg_commits_per_month = (total_commits_last_year / 12) if total_commits_last_year > 0 else 0
+
+            issue_time_stats = self.issue_time_stats(*(issue_times[field] for field in self.ISSUE_TIME_FIELDS))
+
+            return {
+                "total_stars": total_stars,
+                "total_forks": total_forks,
+                "total_pr_merged": total_pr_merged,
+                "total_issues_opened": total_issues_opened,
+                "total_issues_closed": total_issues_closed,
+                "total_commits_last_year": total_commits_last_year,
+                "total_commits_all_time": total_commits_all_time,
+                "avg_commits_per_month": avg_commits_per_month,
+                **issue_time_stats
+            }
         except Exception as e:
             print(f"Exception occurred while fetching repo metrics for {username}: {e}")
             return None
 
-    async def get_contributed_repos(self, session: aiohttp.ClientSession, username: str) -> int:
-        url = f"https://api.github.com/users/{username}/events"
-        try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    events = await response.json()
-                    repos = set()
-                    for event in events:
-                        if event.get("type") in ["PushEvent", "PullRequestEvent", "IssueCommentEvent"]:
-                            repo = event.get("repo", {}).get("name")
-                            if repo:
-                                repos.add(repo)
-                    return len(repos)
-                else:
-                    print(f"Error fetching events for {username}: {response.status}")
-                    return 0
-        except Exception as e:
-            print(f"Exception occurred while fetching events for {username}: {e}")
-            return 0
+    @staticmethod
+    def analyze_events(events: List[Dict]) -> Dict:
+        
+        contributed = set()
+        reviews_count = 0
+        for event in events:
+            event_type = event.get("type")
+            if event_type in GitHubUserExtractor.CONTRIBUTION_EVENT_TYPES:
+                repo = event.get("repo", {}).get("name")
+                if repo:
+                    contributed.add(repo)
+            elif event_type == "PullRequestReviewEvent":
+                reviews_count += 1
+        return {
+            "contributed_repos": len(contributed),
+            "code_reviews_count": reviews_count
+        }
 
-    async def get_code_reviews_count(self, session: aiohttp.ClientSession, username: str) -> int:
-        url = f"https://api.github.com/users/{username}/events"
+    async def get_event_metrics(self, session: aiohttp.ClientSession, username: str) -> Dict:
+        url = f"{self.api_url}/users/{username}/events"
+        events = []
         try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    events = await response.json()
-                    reviews_count = 0
-                    for event in events:
-                        if event.get("type") == "PullRequestReviewEvent":
-                            reviews_count += 1
-                    return reviews_count
-                else:
-                    print(f"Error fetching events for {username}: {response.status}")
-                    return 0
+            for page in range(1, self.EVENT_PAGES + 1):
+                status, page_events = await self._get_json(session, url, params={"per_page": self.EVENTS_PER_PAGE, "page": page})
+                if status != 200:
+                    print(f"Error fetching events for {username}: {status}")
+                    break
+                if page == 1:
+                    # The old contributed-repos and code-reviews stages each fetched the first page separately;
+                    # the later pages are new requests, not savings.
+                    self.event_requests_saved += 1
+                events.extend(page_events)
+                if len(page_events) < self.EVENTS_PER_PAGE:
+                    break
         except Exception as e:
             print(f"Exception occurred while fetching events for {username}: {e}")
-            return 0
+        return self.analyze_events(events)
 
     def is_valid_email(self, email: str) -> bool:
         
@@ -208,74 +601,227 @@ class GitHubUserExtractor:
         email_regex = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
         return re.match(email_regex, email) is not None
 
+    async def process_user(self, session: aiohttp.ClientSession, username: str) -> Tuple[Optional[Dict], bool]:
+        # The flag tells a final outcome (a row, or a rejection by the profile pre-filters) from a failed fetch,
+        # which a resumed crawl should try again.
+        print(f"\nProcessing user: {username}")
+        user_details = await self.get_user_details(session, username)
+        if not user_details:
+            return None, False
+        if not self.prefilter.accepts("profile", username, user_details):
+            return None, True
+        user = await self.fetch_user_metrics(session, username, user_details)
+        return user, user is not None
+
+    async def fetch_user_metrics(self, session: aiohttp.ClientSession, username: str, user_details: Dict) -> Optional[Dict]:
+        profile_changed = bool(self.refresh_state) and self.refresh_state.profile_changed(username, user_details["updated_at"])
+        if profile_changed:
+            self.refresh_stats["profile_changed"] += 1
+
+        repo_metrics, event_metrics = await asyncio.gather(
+            self.get_repo_metrics(session, username, profile_changed),
+            self.get_event_metrics(session, username)
+        )
+        if not repo_metrics:
+            print(f"Failed to fetch repo metrics for user: {username}")
+            return None
+        if self.refresh_state:
+            # Recorded only once the repositories were refreshed, so a failed user is compared against the old profile again.
+            self.refresh_state.record_user(username, user_details["updated_at"])
+
+        print(f"Added details for user: {username}")
+        return {
+            "username": username,
+            "email": user_details["email"],
+            "user_url": user_details["html_url"],
+            "avatar_url": user_details["avatar_url"],
+            "public_repos": user_details["public_repos"],
+            "followers": user_details["followers"],
+            "total_stars": repo_metrics["total_stars"],
+            "total_forks": repo_metrics["total_forks"],
+            "total_pr_merged": repo_metrics["total_pr_merged"],
+            "total_issues_opened": repo_metrics["total_issues_opened"],
+            "total_issues_closed": repo_metrics["total_issues_closed"],
+            "total_commits_last_year": repo_metrics["total_commits_last_year"],
+            "total_commits_all_time": repo_metrics["total_commits_all_time"],
+            "avg_commits_per_month": repo_metrics["avg_commits_per_month"],
+            "avg_issue_close_time": repo_metrics["avg_issue_close_time"],
+            "median_issue_close_time": repo_metrics["median_issue_close_time"],
+            "p90_issue_close_time": repo_metrics["p90_issue_close_time"],
+            "avg_open_issue_age": repo_metrics["avg_open_issue_age"],
+            "contributed_repos": event_metrics["contributed_repos"],
+            "code_reviews_count": event_metrics["code_reviews_count"]
+        }
+
+    async def plan_search_pages(self, session: aiohttp.ClientSession) -> List[Tuple[Union[int, str], str, int, int]]:
+        if not self.shard_by:
+            return [(page, self.search_query, page, 30) for page in range(1, self.pages + 1)]
+
+        shards = await SearchShardPlanner(self, self.shard_by).plan(session, self.search_query)
+        search_pages = []
+        for shard_query, total in shards:
+            # An uncounted shard is crawled as if it were full; pages past its last result come back empty.
+            reachable = SearchShardPlanner.SEARCH_CAP if total is None else min(total, SearchShardPlanner.SEARCH_CAP)
+            shard_pages = min(self.pages, math.ceil(reachable / self.SHARD_PER_PAGE))
+            for page in range(1, shard_pages + 1):
+                search_pages.append((f"{shard_query}#{page}", shard_query, page, self.SHARD_PER_PAGE))
+        return search_pages
+
+    async def collect_usernames(self, session: aiohttp.ClientSession) -> List[str]:
+        if self.refresh_usernames is not None:
+            print(f"Refreshing {len(self.refresh_usernames)} known candidates from {self.refresh_from} instead of searching")
+            if not self.shard_by:
+                self.refresh_stats["requests_saved"] += self.pages
+            return list(dict.fromkeys(self.refresh_usernames))
+        search_pages = await self.plan_search_pages(session)
+        if self.checkpoint:
+            to_fetch = [search_page for search_page in search_pages if self.checkpoint.page_usernames(search_page[0]) is None]
+        else:
+            to_fetch = search_pages
+        fetched = await asyncio.gather(*(self.fetch_users(session, page, query, per_page) for _, query, page, per_page in to_fetch))
+        pages_data = {search_page[0]: users_data for search_page, users_data in zip(to_fetch, fetched)}
+
+        usernames = []
+        for page_key, query, page, _ in search_pages:
+            if page_key not in pages_data:
+                usernames.extend(self.checkpoint.page_usernames(page_key))
+                continue
+            users_data = pages_data[page_key]
+            if users_data and "items" in users_data:
+                page_usernames = []
+                for user in users_data["items"]:
+                    username = user.get("login")
+                    if not username:
+                        print(f"Invalid user data: {user}")
+                    elif self.prefilter.accepts("search", username, user):
+                        page_usernames.append(username)
+                usernames.extend(page_usernames)
+                if self.checkpoint:
+                    self.checkpoint.mark_page(page_key, page_usernames)
+            else:
+                print(f"No user data found for page {page} of {query}")
+
+        # Overlapping shards and shifting search results can return the same user twice.
+        unique_usernames = list(dict.fromkeys(usernames))
+        if len(unique_usernames) < len(usernames):
+            print(f"Removed {len(usernames) - len(unique_usernames)} duplicate usernames")
+        return unique_usernames
+
+    async def process_and_write(self, session: aiohttp.ClientSession, index: int, username: str, row_writer: Optional[OrderedRowWriter]) -> Optional[Dict]:
+        async with self.user_semaphore:
+            user, finished = await self.process_user(session, username)
+        # Journaled as soon as the user completes: a row still waiting for an earlier user when the crawl dies
+        # is missing from the output, and forget_unwritten has it crawled again on resume.
+        # A user whose fetch failed is not journaled at all, so a resume crawls it again too.
+        if self.checkpoint and finished:
+            self.checkpoint.mark_user(username, user is not None)
+        if row_writer:
+            row = user
+            if not finished and username in self.refresh_rows:
+                # A known candidate that could not be fetched keeps its previous row rather than dropping out of the file.
+                row = self.refresh_rows[username]
+                self.carried_forward += 1
+            row_writer.submit(index, username, row)
+        return user
+
     async def extract_users_with_details(self) -> List[Dict[str, str]]:
-        users_with_details = []
-        async with aiohttp.ClientSession() as session:
-            for page in range(1, self.pages + 1):
-                print(f"Fetching page {page}...")
-                users_data = await self.fetch_users(session, page)
-                if users_data and "items" in users_data:
-                    for user in users_data["items"]:
-                        username = user.get("login")
-                        if username:
-                            print(f"\nProcessing user: {username}")
-                            user_details = await self.get_user_details(session, username)
-                            if user_details and user_details.get("email") and self.is_valid_email(user_details["email"]):
-                                repo_metrics = await self.get_repo_metrics(session, username)
-                                contributed_repos = await self.get_contributed_repos(session, username)
-                                code_reviews_count = await self.get_code_reviews_count(session, username)
-                                if repo_metrics:
-                                    users_with_details.append({
-                                        "username": username,
-                                        "email": user_details["email"],
-                                        "user_url": user_details["html_url"],
-                                        "avatar_url": user_details["avatar_url"],
-                                        "public_repos": user_details["public_repos"],
-                                        "followers": user_details["followers"],
-                                        "total_stars": repo_metrics["total_stars"],
-                                        "total_forks": repo_metrics["total_forks"],
-                                        "total_pr_merged": repo_metrics["total_pr_merged"],
-                                        "total_issues_opened": repo_metrics["total_issues_opened"],
-                                        "total_issues_closed": repo_metrics["total_issues_closed"],
-                                        "total_commits_last_year": repo_metrics["total_commits_last_year"],
-                                        "total_commits_all_time": repo_metrics["total_commits_all_time"],
-                                        "avg_commits_per_month": repo_metrics["avg_commits_per_month"],
-                                        "avg_issue_close_time": repo_metrics["avg_issue_close_time"],
-                                        "contributed_repos": contributed_repos,
-                                        "code_reviews_count": code_reviews_count
-                                    })
-                                    print(f"Added details for user: {username}")
-                                else:
-                                    print(f"Failed to fetch repo metrics for user: {username}")
-                            else:
-                                print(f"Invalid or no email found for user: {username}")
-                        else:
-                            print(f"Invalid user data: {user}")
+        start_time = time.perf_counter()
+        write_path = self.output_path
+        if self.refresh_from:
+            self.refresh_rows = RefreshState.load_rows(self.refresh_from)
+            self.refresh_usernames = list(self.refresh_rows)
+            if self.output_path and os.path.abspath(self.output_path) == os.path.abspath(self.refresh_from):
+                # The refresh reads the file it replaces, so it writes next to it and swaps it in only once the crawl completes.
+                root, extension = os.path.splitext(self.output_path)
+                write_path = f"{root}.refresh{extension}"
+        if self.checkpoint_path:
+            self.checkpoint = CrawlCheckpoint(self.checkpoint_path, resume=self.resume)
+            if self.resume and write_path:
+                self.checkpoint.forget_unwritten(read_usernames(write_path))
+        row_writer = None
+        if write_path:
+            row_writer = OrderedRowWriter(open_row_writer(write_path, self.output_fields, self.output_schema,
+                                                          append=self.resume, row_group_size=self.ROW_GROUP_SIZE))
+
+        try:
+            async with self.session_config.open_session() as session:
+                usernames = await self.collect_usernames(session)
+                if self.checkpoint:
+                    skipped = len(usernames)
+                    usernames = [username for username in usernames if not self.checkpoint.is_finished(username)]
+                    skipped -= len(usernames)
+                    if skipped:
+                        print(f"Skipping {skipped} users finished in a previous run")
+                results = await asyncio.gather(*(self.process_and_write(session, index, username, row_writer)
+                                                 for index, username in enumerate(usernames)))
+        finally:
+            if row_writer:
+                row_writer.close()
+                if row_writer.first_row_time is not None:
+                    self.first_row_after = row_writer.first_row_time - start_time
+                    print(f"{row_writer.rows_written} rows written to {write_path}, the first after {self.first_row_after:.1f}s")
                 else:
-                    print(f"No user data found for page {page}")
+                    print(f"{row_writer.rows_written} rows written to {write_path}")
+                if self.carried_forward:
+                    print(f"Kept the previous row of {self.carried_forward} known candidates whose refresh failed")
+            if self.checkpoint:
+                self.checkpoint.close()
+            if self.owns_session_config:
+                await self.session_config.close()
+            if self.refresh_state:
+                self.refresh_state.save()
+
+        if write_path != self.output_path:
+            os.replace(write_path, self.output_path)
+            print(f"Replaced {self.output_path} with the refreshed rows")
+        users_with_details = [user for user in results if user]
+        self.report_throughput(len(usernames), time.perf_counter() - start_time)
         return users_with_details
 
-    def save_to_csv(self, users_with_details: List[Dict[str, str]]):
-        
-        output_dir = "/home/ashwin_jayan/EXTRACT/data_science"
-        os.makedirs(output_dir, exist_ok=True)
-        csv_file_path = os.path.join(output_dir, "users_with_details_data_science_21to41.csv")
+    def report_throughput(self, users_processed: int, elapsed: float):
+        elapsed = max(elapsed, 1e-9)
+        print(f"\nProcessed {users_processed} users with {self.request_count} requests in {elapsed:.1f}s "
+              f"({users_processed / elapsed:.2f} users/sec, {self.request_count / elapsed:.2f} requests/sec)")
+        print("Requests by endpoint: " + ", ".join(f"{endpoint}={count}" for endpoint, count in sorted(self.request_counts.items())))
+        print(f"Shared events fetch saved {self.event_requests_saved} requests")
+        print(f"Issue and PR counts: {self.issue_strategy_stats['paginated_repos']} repos paginated in full "
+              f"({self.issue_strategy_stats['paginated_pages']} pages), {self.issue_strategy_stats['searched_repos']} large repos counted "
+              f"with {self.issue_strategy_stats['search_requests']} search requests instead of {self.issue_strategy_stats['pages_avoided']} more pages")
+        self.prefilter.report()
+        print(f"Retries: {self.retry_stats['retried_requests']} requests retried ({self.retry_stats['retries']} retries), "
+              f"{self.retry_stats['recovered']} recovered, {self.retry_stats['gave_up']} gave up, "
+              f"{self.retry_stats['timeouts']} timeouts, {self.retry_stats['secondary_rate_limits']} secondary rate limits, "
+              f"circuit breaker tripped {self.circuit_breaker.trips} times")
+        self.session_config.metrics.report()
+        self.decoder.report()
+        if self.refresh_state:
+            full_crawl_requests = self.request_count + self.refresh_stats["requests_saved"]
+            saved_share = self.refresh_stats["requests_saved"] / full_crawl_requests if full_crawl_requests else 0.0
+            print(f"Incremental refresh: {self.refresh_stats['skip']} repos unchanged and skipped, "
+                  f"{self.refresh_stats['incremental']} refreshed with since=, {self.refresh_stats['full']} fetched in full, "
+                  f"{self.refresh_stats['profile_changed']} users with a changed profile; "
+                  f"saved {self.refresh_stats['requests_saved']} of ~{full_crawl_requests} requests a full crawl would make ({saved_share:.0%})")
+        if self.cache:
+            self.cache.report()
+        self.token_pool.report()
 
-        
-        with open(csv_file_path, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=[
-                "username", "email", "user_url", "avatar_url", "public_repos", "followers",
-                "total_stars", "total_forks", "total_pr_merged", "total_issues_opened", "total_issues_closed",
-                "total_commits_last_year", "total_commits_all_time", "avg_commits_per_month",
-                "avg_issue_close_time", "contributed_repos", "code_reviews_count"
-            ])
-            writer.writeheader()
-            for user in users_with_details:
-                writer.writerow(user)
-        print(f"Data saved to {csv_file_path}")
-
-async def main(tokens: List[str], search_query: str, pages: int):
-    extractor = GitHubUserExtractor(tokens, search_query, pages)
+    def save_output(self, users_with_details: List[Dict[str, str]]):
+        writer = open_row_writer(self.output_path, self.output_fields, self.output_schema, row_group_size=self.ROW_GROUP_SIZE)
+        for user in users_with_details:
+            writer.write_row(user)
+        writer.close()
+        print(f"Data saved to {self.output_path}")
+
+async def main(tokens: List[str], search_query: str, pages: int, max_concurrency: int, repo_concurrency: int, user_concurrency: int,
+               cache_path: str, resume: bool,
+               incremental: bool = False, refresh_known: bool = False, issue_time_stats: bool = False):
+    cache = ResponseCache(cache_path, CACHE_TTLS, CACHE_MAX_BYTES)
+    refresh_state = RefreshState(REFRESH_STATE_PATH, REFRESH_MAX_AGE_DAYS) if incremental or refresh_known else None
+    refresh_from = OUTPUT_PATH if refresh_known and os.path.exists(OUTPUT_PATH) else None
+    extractor = GitHubUserExtractor(tokens, search_query, pages, max_concurrency, repo_concurrency, cache=cache,
+                                    output_path=OUTPUT_PATH, checkpoint_path=CHECKPOINT_PATH, resume=resume, shard_by=SHARD_BY, role=ROLE,
+                                    session_config=SESSION_CONFIG, refresh_state=refresh_state, refresh_from=refresh_from,
+                                    issue_time_stats=issue_time_stats, user_concurrency=user_concurrency)
     users_with_details = await extractor.extract_users_with_details()
     if users_with_details:
         print("\nUsers with details:")
@@ -286,17 +832,47 @@ async def main(tokens: List[str], search_query: str, pages: int):
                   f"Total Forks: {user['total_forks']}, Total PRs Merged: {user['total_pr_merged']}, "
                   f"Total Issues Opened: {user['total_issues_opened']}, Total Issues Closed: {user['total_issues_closed']}, "
                   f"Total Commits (Last Year): {user['total_commits_last_year']}, Total Commits (All Time): {user['total_commits_all_time']}, "
-                  f"Avg Commits per Month: {user['avg_commits_per_month']}, Avg Issue Close Time: {user['avg_issue_close_time']}, "
+                  f"Avg Commits per Month: {user['avg_commits_per_month']}, Avg Issue Close Time: {user['avg_issue_close_time']:.1f} days, "
+                  f"Median/P90 Issue Close Time: {user['median_issue_close_time']:.1f}/{user['p90_issue_close_time']:.1f} days, "
+                  f"Avg Open Issue Age: {user['avg_open_issue_age']:.1f} days, "
                   f"Contributed Repos: {user['contributed_repos']}, Code Reviews Count: {user['code_reviews_count']}")
-        
-        extractor.save_to_csv(users_with_details)
     else:
         print("No users with valid public emails found.")
+    extractor.token_pool.export_stats(TOKEN_STATS_PATH)
+    cache.close()
+    await SESSION_CONFIG.close()
 
 
 GITHUB_TOKENS = []
 
 SEARCH_QUERY = "data+science"  
+ROLE = "Data Science"
 PAGES = 30  
+SHARD_BY = None
+MAX_CONCURRENCY = 10
+REPO_CONCURRENCY = 8
+# Users crawled at a time; enough to keep MAX_CONCURRENCY requests busy while rows stream out in search order.
+USER_CONCURRENCY = 20
+# Every request goes to one host, so the per-host limit is the real pool size; keep it at or above MAX_CONCURRENCY.
+SESSION_CONFIG = SessionConfig(limit=100, limit_per_host=MAX_CONCURRENCY, keepalive_timeout=30.0, dns_cache_ttl=300,
+                               compress=True, total_timeout=30.0, connect_timeout=10.0, read_timeout=20.0)
+TOKEN_STATS_PATH = "token_stats.csv"
+CACHE_PATH = "github_cache.sqlite"
+CACHE_TTLS = {}
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# A .parquet or .arrows path writes typed columnar output instead of CSV.
+OUTPUT_PATH = "/home/ashwin_jayan/EXTRACT/data_science/users_with_details_data_science_21to41.csv"
+CHECKPOINT_PATH = os.path.splitext(OUTPUT_PATH)[0] + ".checkpoint.jsonl"
+REFRESH_STATE_PATH = os.path.splitext(OUTPUT_PATH)[0] + ".refresh.json"
+REFRESH_MAX_AGE_DAYS = 7
 
-asyncio.run(main(GITHUB_TOKENS, SEARCH_QUERY, PAGES))
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract GitHub candidate profiles and repository metrics.")
+    parser.add_argument("--resume", action="store_true", help="Skip pages and users recorded in the checkpoint journal and append to the output.")
+    parser.add_argument("--incremental", action="store_true", help="Skip repositories unchanged since the last run, using the refresh state sidecar.")
+    parser.add_argument("--refresh-known", action="store_true", help="Incrementally refresh the candidates of the previous output instead of searching.")
+    parser.add_argument("--issue-time-stats", action="store_true",
+                        help="Also write median/p90 issue close time and open issue age columns, which the model and database do not read.")
+    args = parser.parse_args()
+    asyncio.run(main(GITHUB_TOKENS, SEARCH_QUERY, PAGES, MAX_CONCURRENCY, REPO_CONCURRENCY, USER_CONCURRENCY, CACHE_PATH, args.resume,
+                     args.incremental, args.refresh_known, args.issue_time_stats))
\ No newline at end of file
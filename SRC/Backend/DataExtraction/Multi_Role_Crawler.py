@@ -0,0 +1,184 @@
+'''This script crawls the search queries of several roles in one process and writes one candidate file tagged by role:
+1. Takes a list of (role, query) jobs, from ROLE_JOBS or from repeated --job "Role=query" options.
+2. Runs the searches of all jobs concurrently, each with its role's pre-filters, through one token pool, one response cache,
+   one circuit breaker, one limit on in-flight requests and one keep-alive connection pool.
+3. Merges the results: a user found by several queries is kept once, in the order first found, with every role that found them.
+4. Fetches each user's profile once and checks it against the profile pre-filters of each of their roles;
+   repositories and events are crawled only if at least one role accepts, and the row is tagged with the accepting roles.
+5. Crawls at most user_concurrency candidates at a time in merged order and streams their rows in that order
+   to one output (CSV, Parquet or Arrow IPC) with an extra roles column,
+   and reports per-role counts, the overlap between roles and the requests the deduplication saved.
+
+Crawl the default jobs, or name them on the command line:
+    python Multi_Role_Crawler.py --job "Data Science=data+science" --job "Web Developer=web+developer" --pages 10'''
+
+import aiohttp
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from Circuit_Breaker import CircuitBreaker
+from GitHub_Data_Fetch import GitHubUserExtractor
+from Output_Writers import OrderedRowWriter, open_row_writer
+from Pre_Filters import PreFilterChain
+from Response_Cache import ResponseCache
+from Session_Config import SessionConfig
+from Token_Pool import TokenPool
+
+class MultiRoleCrawler:
+    ROLE_SEPARATOR = ";"
+    OUTPUT_TYPES = {**GitHubUserExtractor.OUTPUT_TYPES, "roles": "string"}
+
+    def output_schema(self):
+        return GitHubUserExtractor.build_schema(self.output_fields, self.OUTPUT_TYPES)
+
+    def __init__(self, tokens: List[str], jobs: List[Tuple[str, str]], pages: int, max_concurrency: int = 10, repo_concurrency: int = 8,
+                 api_url: str = "https://api.github.com", cache: Optional[ResponseCache] = None, output_path: Optional[str] = None,
+                 shard_by: Optional[str] = None, session_config: Optional[SessionConfig] = None, issue_time_stats: bool = False,
+                 user_concurrency: int = 20):
+        roles = [role for role, _ in jobs]
+        if not roles:
+            raise ValueError("At least one (role, query) job is needed")
+        if len(set(roles)) < len(roles):
+            raise ValueError(f"Each role can only have one job, got {roles}")
+        self.jobs = jobs
+        self.output_path = output_path
+        self.owns_session_config = session_config is None
+        self.session_config = session_config or SessionConfig(limit_per_host=max(max_concurrency, 1))
+        shared = {"api_url": api_url, "cache": cache, "session_config": self.session_config,
+                  "circuit_breaker": CircuitBreaker(), "token_pool": TokenPool(tokens)}
+        # Profiles are checked against each role's own chain in process_candidate, so the detail crawl runs without one.
+        self.details = GitHubUserExtractor(tokens, "", pages, max_concurrency, repo_concurrency, prefilter=PreFilterChain([]),
+                                           issue_time_stats=issue_time_stats, user_concurrency=user_concurrency, **shared)
+        self.output_fields = self.details.output_fields + ["roles"]
+        self.searchers = {role: GitHubUserExtractor(tokens, query, pages, max_concurrency, repo_concurrency,
+                                                    shard_by=shard_by, role=role, **shared) for role, query in jobs}
+        for searcher in self.searchers.values():
+            # One limit on in-flight requests for all jobs, as in a single-query crawl.
+            searcher.semaphore = self.details.semaphore
+        self.found = Counter()
+        self.accepted = Counter()
+        self.extra_matches = 0
+
+    async def collect_candidates(self, session: aiohttp.ClientSession) -> Dict[str, List[str]]:
+        found = await asyncio.gather(*(searcher.collect_usernames(session) for searcher in self.searchers.values()))
+        candidates: Dict[str, List[str]] = {}
+        for role, usernames in zip(self.searchers, found):
+            self.found[role] = len(usernames)
+            for username in usernames:
+                candidates.setdefault(username, []).append(role)
+        self.extra_matches = sum(self.found.values()) - len(candidates)
+        print(f"Found {len(candidates)} unique users for {len(self.jobs)} roles; "
+              f"{sum(len(roles) > 1 for roles in candidates.values())} matched more than one role")
+        return candidates
+
+    async def process_candidate(self, session: aiohttp.ClientSession, index: int, username: str, roles: List[str],
+                                row_writer: Optional[OrderedRowWriter]) -> Optional[Dict]:
+        async with self.details.user_semaphore:
+            row = await self.fetch_candidate(session, username, roles)
+        if row_writer:
+            row_writer.submit(index, username, row)
+        return row
+
+    async def fetch_candidate(self, session: aiohttp.ClientSession, username: str, roles: List[str]) -> Optional[Dict]:
+        print(f"\nProcessing user: {username} ({', '.join(roles)})")
+        row = None
+        user_details = await self.details.get_user_details(session, username)
+        if user_details:
+            accepted = [role for role in roles if self.searchers[role].prefilter.accepts("profile", username, user_details)]
+            if accepted:
+                row = await self.details.fetch_user_metrics(session, username, user_details)
+            if row:
+                row["roles"] = self.ROLE_SEPARATOR.join(accepted)
+                self.accepted.update(accepted)
+        return row
+
+    async def crawl(self) -> List[Dict]:
+        start_time = time.perf_counter()
+        row_writer = None
+        if self.output_path:
+            row_writer = OrderedRowWriter(open_row_writer(self.output_path, self.output_fields, self.output_schema,
+                                                          row_group_size=GitHubUserExtractor.ROW_GROUP_SIZE))
+        try:
+            async with self.session_config.open_session() as session:
+                candidates = await self.collect_candidates(session)
+                results = await asyncio.gather(*(self.process_candidate(session, index, username, roles, row_writer)
+                                                 for index, (username, roles) in enumerate(candidates.items())))
+        finally:
+            if row_writer:
+                row_writer.close()
+                print(f"{row_writer.rows_written} rows written to {self.output_path}")
+            if self.owns_session_config:
+                await self.session_config.close()
+
+        rows = [row for row in results if row]
+        self.report(len(candidates), time.perf_counter() - start_time)
+        return rows
+
+    def report(self, candidates: int, elapsed: float):
+        print()
+        for role, searcher in self.searchers.items():
+            print(f"{role} ({searcher.search_query}): {self.found[role]} users found with {searcher.request_count} search requests, "
+                  f"{self.accepted[role]} rows")
+            searcher.prefilter.report()
+            # The searches and shard counts ran on the searchers, so their requests are added to the crawl totals.
+            self.details.request_count += searcher.request_count
+            self.details.request_counts.update(searcher.request_counts)
+        requests_per_candidate = self.details.request_count / candidates if candidates else 0.0
+        print(f"{self.extra_matches} repeated matches across roles were fetched once, "
+              f"saving about {self.extra_matches * requests_per_candidate:.0f} requests")
+        self.details.report_throughput(candidates, elapsed)
+
+async def main(tokens: List[str], jobs: List[Tuple[str, str]], pages: int, max_concurrency: int, repo_concurrency: int,
+               user_concurrency: int, api_url: str, cache_path: str, output_path: str, issue_time_stats: bool = False):
+    cache = ResponseCache(cache_path, CACHE_TTLS, CACHE_MAX_BYTES)
+    crawler = MultiRoleCrawler(tokens, jobs, pages, max_concurrency, repo_concurrency, api_url=api_url, cache=cache,
+                               output_path=output_path, shard_by=SHARD_BY, session_config=SESSION_CONFIG,
+                               issue_time_stats=issue_time_stats, user_concurrency=user_concurrency)
+    rows = await crawler.crawl()
+    if not rows:
+        print("No users with valid public emails found.")
+    crawler.details.token_pool.export_stats(TOKEN_STATS_PATH)
+    cache.close()
+    await SESSION_CONFIG.close()
+
+def parse_job(value: str) -> Tuple[str, str]:
+    role, separator, query = value.partition("=")
+    if not separator or not role.strip() or not query.strip():
+        raise argparse.ArgumentTypeError(f"Expected ROLE=QUERY, got {value!r}")
+    return role.strip(), query.strip()
+
+
+GITHUB_TOKENS = []
+
+ROLE_JOBS = [
+    ("Data Science", "data+science"),
+    ("Web Developer", "web+developer"),
+    ("Java Developer", "java+developer")
+]
+PAGES = 30
+SHARD_BY = None
+MAX_CONCURRENCY = 10
+REPO_CONCURRENCY = 8
+USER_CONCURRENCY = 20
+SESSION_CONFIG = SessionConfig(limit=100, limit_per_host=MAX_CONCURRENCY, keepalive_timeout=30.0, dns_cache_ttl=300,
+                               compress=True, total_timeout=30.0, connect_timeout=10.0, read_timeout=20.0)
+TOKEN_STATS_PATH = "token_stats_multi_role.csv"
+CACHE_PATH = "github_cache.sqlite"
+CACHE_TTLS = {}
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+OUTPUT_PATH = "/home/ashwin_jayan/EXTRACT/users_with_details_all_roles.csv"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl the search queries of several roles at once and tag candidates with their roles.")
+    parser.add_argument("--job", type=parse_job, action="append", metavar="ROLE=QUERY",
+                        help="A role and its user search query; repeat for more roles. Defaults to ROLE_JOBS.")
+    parser.add_argument("--pages", type=int, default=PAGES, help="Search pages to crawl per role.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Output file; .parquet or .arrows writes typed columnar output.")
+    parser.add_argument("--api-url", default="https://api.github.com", help="GitHub API base URL, e.g. a Fake_GitHub_Server.")
+    parser.add_argument("--issue-time-stats", action="store_true", help="Also write the median/p90 issue close time and open issue age columns.")
+    args = parser.parse_args()
+    asyncio.run(main(GITHUB_TOKENS, args.job or ROLE_JOBS, args.pages, MAX_CONCURRENCY, REPO_CONCURRENCY, USER_CONCURRENCY,
+                     args.api_url, CACHE_PATH, args.output, args.issue_time_stats))
@@ -0,0 +1,220 @@
+'''This module streams extracted candidate rows to the output file while the crawl is running:
+1. CsvRowWriter appends rows to a CSV file and flushes after each one, writing the header only for a new file.
+2. ParquetRowWriter writes typed, compressed Parquet with a fixed schema, one row group per batch of finished users.
+   It writes to a temporary file that replaces the output on close, so a crash leaves the previous file intact.
+3. ArrowIpcRowWriter writes the Arrow IPC stream format batch by batch; every complete batch stays readable after a crash.
+4. open_row_writer picks the writer from the file extension (.csv, .parquet, .arrow/.arrows), and read_usernames
+   reads back only the username column of any of them, so a resumed crawl can tell which rows really reached the file.
+   read_rows reads back whole rows, so a refresh can keep the previous row of a candidate it could not fetch.
+5. OrderedRowWriter accepts rows in completion order but writes them in search order,
+   releasing each row as soon as every earlier user has finished, and notes when the first row was written.
+6. pyarrow is imported by the columnar writers only, and open_row_writer accepts a schema factory,
+   so importing this module or writing CSV does not load it.'''
+
+import csv
+import os
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+class CsvRowWriter:
+    def __init__(self, path: str, fieldnames: List[str], append: bool = False):
+        self.path = path
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self.file = open(path, mode="a" if append else "w", newline="", encoding="utf-8")
+        # Like the columnar writers, the fieldnames pick the columns, so rows may carry values that are not written.
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            self.writer.writeheader()
+            self.file.flush()
+
+    def write_row(self, row: Dict):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def read_usernames(path: str) -> List[str]:
+        with open(path, newline="", encoding="utf-8") as file:
+            return [row["username"] for row in csv.DictReader(file) if row.get("username")]
+
+    @staticmethod
+    def read_rows(path: str) -> List[Dict]:
+        with open(path, newline="", encoding="utf-8") as file:
+            return [row for row in csv.DictReader(file) if row.get("username")]
+
+class ParquetRowWriter:
+    def __init__(self, path: str, schema: "pa.Schema", append: bool = False, row_group_size: int = 500, compression: str = "zstd"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.temporary_path = path + ".tmp"
+        self.writer = pq.ParquetWriter(self.temporary_path, schema, compression=compression)
+        if append and os.path.exists(path):
+            # Parquet files cannot be appended to, so the rows of the previous run are copied into the new file first.
+            try:
+                self.writer.write_table(pq.read_table(path, schema=schema), row_group_size=row_group_size)
+            except (pa.ArrowInvalid, OSError) as e:
+                print(f"Could not read previous output {path} ({e}); its users will be crawled again")
+        self.rows: List[Dict] = []
+
+    def write_row(self, row: Dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.replace(self.temporary_path, self.path)
+
+    @staticmethod
+    def read_usernames(path: str) -> List[str]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            return pq.read_table(path, columns=["username"]).column("username").to_pylist()
+        except (pa.ArrowInvalid, OSError):
+            return []
+
+    @staticmethod
+    def read_rows(path: str) -> List[Dict]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            return pq.read_table(path).to_pylist()
+        except (pa.ArrowInvalid, OSError):
+            return []
+
+class ArrowIpcRowWriter:
+    def __init__(self, path: str, schema: "pa.Schema", append: bool = False, row_group_size: int = 500):
+        import pyarrow as pa
+
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        previous_batches = self.read_batches(path) if append and os.path.exists(path) else []
+        self.sink = pa.OSFile(path, mode="wb")
+        self.writer = pa.ipc.new_stream(self.sink, schema)
+        for batch in previous_batches:
+            self.writer.write_batch(batch)
+        self.rows: List[Dict] = []
+
+    @staticmethod
+    def read_batches(path: str) -> List["pa.RecordBatch"]:
+        import pyarrow as pa
+
+        batches = []
+        try:
+            with pa.OSFile(path, mode="rb") as source:
+                reader = pa.ipc.open_stream(source)
+                # A crash can cut the stream inside a batch; every batch before it is still intact.
+                while True:
+                    try:
+                        batches.append(reader.read_next_batch())
+                    except StopIteration:
+                        break
+        except (pa.ArrowInvalid, OSError) as e:
+            print(f"Stopped reading {path} at a damaged batch ({e}); later users will be crawled again")
+        return batches
+
+    def write_row(self, row: Dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+
+        if self.rows:
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.rows, schema=self.schema))
+            self.sink.flush()
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        self.sink.close()
+
+    @classmethod
+    def read_usernames(cls, path: str) -> List[str]:
+        return [username for batch in cls.read_batches(path) for username in batch.column("username").to_pylist()]
+
+    @classmethod
+    def read_rows(cls, path: str) -> List[Dict]:
+        return [row for batch in cls.read_batches(path) for row in batch.to_pylist()]
+
+RowWriter = Union[CsvRowWriter, ParquetRowWriter, ArrowIpcRowWriter]
+
+def writer_class(path: str):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return ParquetRowWriter
+    if extension in (".arrow", ".arrows"):
+        return ArrowIpcRowWriter
+    return CsvRowWriter
+
+def open_row_writer(path: str, fieldnames: List[str], schema: Union["pa.Schema", Callable[[], "pa.Schema"]], append: bool = False,
+                    row_group_size: int = 500) -> RowWriter:
+    row_writer_class = writer_class(path)
+    if row_writer_class is CsvRowWriter:
+        return CsvRowWriter(path, fieldnames, append=append)
+    # A schema factory is only called here, so a CSV run never imports pyarrow.
+    return row_writer_class(path, schema() if callable(schema) else schema, append=append, row_group_size=row_group_size)
+
+def read_usernames(path: str) -> List[str]:
+    if not os.path.exists(path):
+        return []
+    return writer_class(path).read_usernames(path)
+
+def read_rows(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    return writer_class(path).read_rows(path)
+
+class OrderedRowWriter:
+    def __init__(self, writer: RowWriter):
+        self.writer = writer
+        self.pending: Dict[int, Tuple[str, Optional[Dict]]] = {}
+        self.next_index = 0
+        self.rows_written = 0
+        self.first_row_time: Optional[float] = None
+
+    def submit(self, index: int, username: str, row: Optional[Dict]):
+        self.pending[index] = (username, row)
+        while self.next_index in self.pending:
+            username, row = self.pending.pop(self.next_index)
+            if row:
+                self.writer.write_row(row)
+                self.rows_written += 1
+                if self.first_row_time is None:
+                    self.first_row_time = time.perf_counter()
+            self.next_index += 1
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,139 @@
+'''This module decodes GitHub response bodies into only the fields the extractors read:
+1. Declares msgspec Structs for the projected shape of each endpoint class (users, search results, repositories,
+   issues, pull requests, commits, single commits with their files, events). msgspec skips every other field while parsing instead of building it.
+2. Converts the projected Structs back to plain dicts, leaving out absent fields,
+   so callers keep using dict.get with the same defaults as before.
+3. Falls back to a full decode (orjson if installed, otherwise json) for endpoints without a projection,
+   for payloads that do not match their projection, and when msgspec is not installed.
+4. Counts decoded pages and the decoding time per endpoint class for the end-of-run report.'''
+
+import json
+import time
+from collections import Counter
+from typing import Any, List, Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def full_decode(body: bytes) -> Any:
+    return orjson.loads(body) if orjson else json.loads(body)
+
+if msgspec:
+    # omit_defaults keeps absent and null fields out of the dicts, exactly as missing keys behaved with json.loads.
+    class SearchItem(msgspec.Struct, omit_defaults=True):
+        login: Optional[str] = None
+        type: Optional[str] = None
+
+    class SearchResult(msgspec.Struct):
+        total_count: int
+        items: List[SearchItem]
+
+    class User(msgspec.Struct, omit_defaults=True):
+        login: Optional[str] = None
+        type: Optional[str] = None
+        email: Optional[str] = None
+        html_url: Optional[str] = None
+        avatar_url: Optional[str] = None
+        public_repos: Optional[int] = None
+        followers: Optional[int] = None
+        updated_at: Optional[str] = None
+
+    class Repo(msgspec.Struct, omit_defaults=True):
+        name: Optional[str] = None
+        stargazers_count: Optional[int] = None
+        forks_count: Optional[int] = None
+        open_issues_count: Optional[int] = None
+        pushed_at: Optional[str] = None
+        updated_at: Optional[str] = None
+
+    class PullRequestRef(msgspec.Struct, omit_defaults=True):
+        merged_at: Optional[str] = None
+
+    class Issue(msgspec.Struct, omit_defaults=True):
+        state: Optional[str] = None
+        created_at: Optional[str] = None
+        closed_at: Optional[str] = None
+        pull_request: Optional[PullRequestRef] = None
+
+    class PullRequest(msgspec.Struct, omit_defaults=True):
+        state: Optional[str] = None
+        merged_at: Optional[str] = None
+
+    class CommitAuthor(msgspec.Struct, omit_defaults=True):
+        date: Optional[str] = None
+
+    class CommitDetail(msgspec.Struct, omit_defaults=True):
+        message: Optional[str] = None
+        author: Optional[CommitAuthor] = None
+
+    class Commit(msgspec.Struct, omit_defaults=True):
+        sha: Optional[str] = None
+        commit: Optional[CommitDetail] = None
+
+    class CommitFile(msgspec.Struct, omit_defaults=True):
+        filename: Optional[str] = None
+
+    class CommitWithFiles(msgspec.Struct, omit_defaults=True):
+        sha: Optional[str] = None
+        commit: Optional[CommitDetail] = None
+        files: Optional[List[CommitFile]] = None
+
+    class EventRepo(msgspec.Struct, omit_defaults=True):
+        name: Optional[str] = None
+
+    class Event(msgspec.Struct, omit_defaults=True):
+        type: Optional[str] = None
+        repo: Optional[EventRepo] = None
+
+    PROJECTIONS = {
+        "search": SearchResult,
+        "user": User,
+        "repos": List[Repo],
+        "issues": List[Issue],
+        "pulls": List[PullRequest],
+        "commits": List[Commit],
+        "commit": CommitWithFiles,
+        "events": List[Event]
+    }
+else:
+    PROJECTIONS = {}
+
+class PayloadDecoder:
+    def __init__(self, project: bool = True):
+        self.decoders = {}
+        if project and msgspec:
+            self.decoders = {endpoint: msgspec.json.Decoder(projection) for endpoint, projection in PROJECTIONS.items()}
+        self.pages = Counter()
+        self.decode_time = Counter()
+        self.fallbacks = 0
+
+    def decode(self, endpoint: str, body: bytes) -> Any:
+        start_time = time.perf_counter()
+        decoder = self.decoders.get(endpoint)
+        if decoder is None:
+            payload = full_decode(body)
+        else:
+            try:
+                payload = msgspec.to_builtins(decoder.decode(body))
+            except msgspec.ValidationError:
+                # GitHub changed a field's type or the endpoint answered with another shape; decode it all instead.
+                self.fallbacks += 1
+                payload = full_decode(body)
+        self.pages[endpoint] += 1
+        self.decode_time[endpoint] += time.perf_counter() - start_time
+        return payload
+
+    def report(self):
+        mode = "projected msgspec" if self.decoders else "orjson" if orjson else "json"
+        total_time = sum(self.decode_time.values())
+        print(f"Decoding ({mode}): {sum(self.pages.values())} pages in {total_time * 1000:.0f} ms, "
+              + ", ".join(f"{endpoint}={self.decode_time[endpoint] / self.pages[endpoint] * 1e6:.0f} us/page"
+                          for endpoint in sorted(self.pages))
+              + (f", {self.fallbacks} fell back to a full decode" if self.fallbacks else ""))
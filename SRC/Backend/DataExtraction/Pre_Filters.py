@@ -0,0 +1,85 @@
+'''This module rejects low-signal candidates before the expensive repository crawl:
+1. A PreFilter is a named predicate attached to a stage: "search" runs on the search result item (no extra request),
+   "profile" runs on the fields of /users/{username} (one request), both before any repository request.
+2. PreFilterChain runs the filters of a stage in order and stops at the first rejection.
+3. for_role builds the default chain from per-role thresholds on public repositories and followers,
+   plus the valid-email and account-type checks every role needs.
+4. The chain counts drops per filter and estimates the API calls each drop saved.'''
+
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+class PreFilter:
+    def __init__(self, name: str, stage: str, predicate: Callable[[Dict], bool]):
+        if stage not in PreFilterChain.STAGES:
+            raise ValueError(f"Unknown pre-filter stage {stage!r}, expected one of {PreFilterChain.STAGES}")
+        self.name = name
+        self.stage = stage
+        self.predicate = predicate
+
+class PreFilterChain:
+    STAGES = ("search", "profile")
+    ROLE_THRESHOLDS = {
+        "Data Science": {"min_public_repos": 3, "min_followers": 1},
+        "Web Developer": {"min_public_repos": 5, "min_followers": 1},
+        "Java Developer": {"min_public_repos": 3, "min_followers": 1}
+    }
+    # Requests per repository in get_repo_metrics, and the repository list page it is read from.
+    REQUESTS_PER_REPO = 3
+    MAX_REPOS_PER_USER = 30
+
+    def __init__(self, filters: List[PreFilter]):
+        self.filters = filters
+        self.checked = Counter()
+        self.dropped = Counter()
+        self.calls_saved = 0
+        self.profiles_seen = 0
+        self.public_repos_seen = 0
+        self.search_drops = 0
+
+    @classmethod
+    def for_role(cls, role: Optional[str], is_valid_email: Callable[[str], bool]) -> "PreFilterChain":
+        thresholds = cls.ROLE_THRESHOLDS.get(role, {})
+        min_public_repos = thresholds.get("min_public_repos", 0)
+        min_followers = thresholds.get("min_followers", 0)
+        filters = [
+            PreFilter("user_account", "search", lambda item: item.get("type", "User") == "User" and not item.get("login", "").endswith("[bot]")),
+            PreFilter("valid_email", "profile", lambda profile: bool(profile.get("email")) and is_valid_email(profile["email"]))
+        ]
+        if min_public_repos:
+            filters.append(PreFilter("min_public_repos", "profile", lambda profile: (profile.get("public_repos") or 0) >= min_public_repos))
+        if min_followers:
+            filters.append(PreFilter("min_followers", "profile", lambda profile: (profile.get("followers") or 0) >= min_followers))
+        return cls(filters)
+
+    def estimate_fanout_calls(self, public_repos: int) -> int:
+        # Repository list, the per-repository requests and at least one events page.
+        return 1 + self.REQUESTS_PER_REPO * min(public_repos, self.MAX_REPOS_PER_USER) + 1
+
+    def accepts(self, stage: str, username: str, record: Dict) -> bool:
+        if stage == "profile":
+            self.profiles_seen += 1
+            self.public_repos_seen += record.get("public_repos") or 0
+        for pre_filter in self.filters:
+            if pre_filter.stage != stage:
+                continue
+            self.checked[pre_filter.name] += 1
+            if not pre_filter.predicate(record):
+                self.dropped[pre_filter.name] += 1
+                if stage == "profile":
+                    self.calls_saved += self.estimate_fanout_calls(record.get("public_repos") or 0)
+                else:
+                    self.search_drops += 1
+                print(f"Skipping {username}: rejected by the {pre_filter.name} pre-filter")
+                return False
+        return True
+
+    def report(self):
+        if not self.filters:
+            return
+        # Search-stage drops also skip the profile request; their repository count is unknown, so use the average seen.
+        average_repos = round(self.public_repos_seen / self.profiles_seen) if self.profiles_seen else 0
+        calls_saved = self.calls_saved + self.search_drops * (1 + self.estimate_fanout_calls(average_repos))
+        print("Pre-filter drops: " + ", ".join(f"{pre_filter.name}={self.dropped[pre_filter.name]}/{self.checked[pre_filter.name]}"
+                                             for pre_filter in self.filters))
+        print(f"Pre-filters saved an estimated {calls_saved} API calls")
@@ -0,0 +1,81 @@
+'''This module keeps the per-repository state an incremental refresh compares against:
+1. Stores, for every known candidate, the profile's updated_at and, per repository, its pushed_at, updated_at,
+   the time its metrics were last fetched and the metrics themselves, in a JSON sidecar next to the output.
+2. Plans each repository of a new run: "skip" when pushed_at and updated_at are unchanged (stored metrics are reused
+   without any request), "incremental" when it changed or the profile's updated_at moved since the last run
+   (issues are re-fetched only when a since= probe finds changes, commits are re-counted with one request each),
+   and "full" for new repositories, state older than
+   max_age_days (which also bounds the drift of rolling windows) and state that lacks a metric the extractor now records.
+   Each repository also keeps the number of requests its last full fetch took, which is what skipping it saves.
+3. Loads the rows of a previous output file by username, so known candidates can be refreshed without repeating the search
+   and a candidate whose refresh fails keeps its previous row.
+4. Writes the sidecar atomically, so an interrupted run keeps the previous state intact.'''
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from Output_Writers import read_rows
+
+class RefreshState:
+    TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+    def __init__(self, path: str, max_age_days: int = 7):
+        self.path = path
+        self.max_age = timedelta(days=max_age_days)
+        self.users: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.users = json.load(file)
+            print(f"Loaded refresh state for {len(self.users)} candidates from {path}")
+        self.started_at = datetime.now(timezone.utc).strftime(self.TIME_FORMAT)
+
+    def repo(self, username: str, repo_name: str) -> Optional[Dict]:
+        return self.users.get(username, {}).get("repos", {}).get(repo_name)
+
+    def profile_changed(self, username: str, updated_at: Optional[str]) -> bool:
+        user = self.users.get(username)
+        return user is not None and user.get("updated_at") != updated_at
+
+    def plan(self, previous: Optional[Dict], repo: Dict, metric_fields: Iterable[str] = (), profile_changed: bool = False) -> str:
+        # State written before a metric existed cannot supply it, so such a repository is fetched in full once.
+        if previous is None or any(field not in previous["metrics"] for field in metric_fields):
+            return "full"
+        refreshed_at = datetime.strptime(previous["refreshed_at"], self.TIME_FORMAT).replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - refreshed_at > self.max_age:
+            return "full"
+        # A changed profile (a rename, a transfer, edited settings) is not trusted to leave the repositories untouched,
+        # so unchanged repositories are checked with the cheap since= probe instead of being skipped.
+        if not profile_changed and previous["pushed_at"] == repo.get("pushed_at") and previous["updated_at"] == repo.get("updated_at"):
+            return "skip"
+        return "incremental"
+
+    def record_user(self, username: str, updated_at: Optional[str]):
+        self.users.setdefault(username, {"repos": {}})["updated_at"] = updated_at
+
+    def record_repo(self, username: str, repo: Dict, metrics: Dict, refreshed_at: str, full_requests: Optional[int] = None):
+        user = self.users.setdefault(username, {"repos": {}})
+        user["repos"][repo.get("name")] = {
+            "pushed_at": repo.get("pushed_at"),
+            "updated_at": repo.get("updated_at"),
+            "refreshed_at": refreshed_at,
+            "full_requests": full_requests,
+            "metrics": metrics
+        }
+
+    def prune_repos(self, username: str, repo_names: List[str]):
+        # Deleted or renamed repositories would otherwise be carried along forever.
+        repos = self.users.get(username, {}).get("repos", {})
+        for repo_name in set(repos) - set(repo_names):
+            del repos[repo_name]
+
+    @staticmethod
+    def load_rows(output_path: str) -> Dict[str, Dict]:
+        return {row["username"]: row for row in read_rows(output_path)}
+
+    def save(self):
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, mode="w", encoding="utf-8") as file:
+            json.dump(self.users, file)
+        os.replace(temporary_path, self.path)
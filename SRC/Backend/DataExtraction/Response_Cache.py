@@ -0,0 +1,112 @@
+'''This module keeps a disk-backed cache of GitHub API responses in SQLite:
+1. Stores the body, status and relevant headers of every successful GET response, keyed by URL and parameters.
+2. Serves entries younger than the TTL of their endpoint class (search, user, repos, pulls, ...) without any request.
+3. Revalidates older entries with If-None-Match / If-Modified-Since, so a 304 is answered from disk
+   and does not count against the primary rate limit.
+4. Evicts the least recently used entries once the stored bodies exceed a size budget.
+5. Counts hits, misses, revalidations and evictions for the end-of-run report.'''
+
+import json
+import sqlite3
+import time
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+class ResponseCache:
+    DEFAULT_TTLS = {
+        "search": 6 * 3600,
+        "user": 24 * 3600,
+        "repos": 24 * 3600,
+        "pulls": 12 * 3600,
+        "issues": 12 * 3600,
+        "commits": 12 * 3600,
+        # A single commit is addressed by its SHA and never changes.
+        "commit": 30 * 24 * 3600,
+        "events": 3600
+    }
+    CACHED_HEADERS = ["Link", "ETag", "Last-Modified"]
+
+    def __init__(self, path: str = "github_cache.sqlite", ttls: Optional[Dict[str, int]] = None, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, headers TEXT, body BLOB, "
+            "stored_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        return f"{url}?{urlencode(sorted((params or {}).items()))}" if params else url
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        row = self.connection.execute("SELECT endpoint, headers, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return {"endpoint": row[0], "headers": json.loads(row[1]), "body": row[2], "stored_at": row[3]}
+
+    def is_fresh(self, entry: Dict) -> bool:
+        fresh = time.time() - entry["stored_at"] < self.ttls.get(entry["endpoint"], 0)
+        if fresh:
+            self.hits += 1
+        return fresh
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        if not entry:
+            return {}
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def mark_revalidated(self, key: str):
+        self.revalidated += 1
+        self.connection.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def store(self, key: str, endpoint: str, headers, body: bytes):
+        self.misses += 1
+        cached_headers = {name: headers[name] for name in self.CACHED_HEADERS if name in headers}
+        if not (cached_headers.get("ETag") or cached_headers.get("Last-Modified") or self.ttls.get(endpoint)):
+            return
+        now = time.time()
+        previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if previous:
+            self.total_bytes -= previous[0]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses (key, endpoint, headers, body, stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, endpoint, json.dumps(cached_headers), body, now, now, len(body))
+        )
+        self.total_bytes += len(body)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        # Trim to 90% of the budget so a full cache does not evict on every single store.
+        target = self.max_bytes * 0.9
+        rows = self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def report(self):
+        print(f"Response cache: {self.hits} hits, {self.misses} misses, {self.revalidated} revalidated (304), "
+              f"{self.evictions} evictions, {self.total_bytes / (1024 * 1024):.1f} MB stored")
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,81 @@
+'''This module splits a user search into shards that each stay under GitHub's 1000-result search cap:
+1. Appends a range qualifier on one dimension to the query: account creation date (created:), repository count (repos:)
+   or follower count (followers:).
+2. Reads the total_count of each shard with a one-result search request.
+3. Halves any shard that still reports more than 1000 results and plans both halves concurrently,
+   until it fits or the range cannot be split any further.
+4. Returns the shard queries with their result counts, so the extractor can crawl every shard with per_page=100.
+   A shard whose count failed is kept with an unknown (None) total instead of being dropped as empty,
+   and the extractor crawls it up to the search cap.'''
+
+import asyncio
+import aiohttp
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+class SearchShardPlanner:
+    SEARCH_CAP = 1000
+    RANGES = {
+        "created": (date(2007, 10, 1), None),
+        "repos": (0, 100000),
+        "followers": (0, 1000000)
+    }
+
+    def __init__(self, extractor, dimension: str = "created"):
+        if dimension not in self.RANGES:
+            raise ValueError(f"Unknown shard dimension {dimension!r}, expected one of {sorted(self.RANGES)}")
+        self.extractor = extractor
+        self.dimension = dimension
+        self.count_requests = 0
+
+    def qualifier(self, low, high) -> str:
+        return f"{self.dimension}:{low.isoformat() if isinstance(low, date) else low}..{high.isoformat() if isinstance(high, date) else high}"
+
+    @staticmethod
+    def split(low, high) -> Optional[Tuple[tuple, tuple]]:
+        if isinstance(low, date):
+            if low >= high:
+                return None
+            middle = low + (high - low) // 2
+            return (low, middle), (middle + timedelta(days=1), high)
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        return (low, middle), (middle + 1, high)
+
+    async def count(self, session: aiohttp.ClientSession, query: str) -> Optional[int]:
+        url = f"{self.extractor.api_url}/search/users?q={query}&per_page=1"
+        self.count_requests += 1
+        try:
+            status, result = await self.extractor._get_json(session, url)
+            if status == 200:
+                return result.get("total_count", 0)
+            print(f"Error counting search results for {query}: {status}")
+        except Exception as e:
+            print(f"Exception occurred while counting search results for {query}: {e}")
+        return None
+
+    async def plan_range(self, session: aiohttp.ClientSession, query: str, low, high) -> List[Tuple[str, Optional[int]]]:
+        shard_query = f"{query}+{self.qualifier(low, high)}"
+        total = await self.count(session, shard_query)
+        if total is None:
+            # A failed count is not an empty range: keep the shard and crawl it up to the search cap.
+            print(f"Could not count {shard_query}; crawling it without a known total")
+            return [(shard_query, None)]
+        if not total:
+            return []
+        halves = self.split(low, high) if total > self.SEARCH_CAP else None
+        if total > self.SEARCH_CAP and not halves:
+            print(f"Shard {shard_query} has {total} results and cannot be split further; only the first {self.SEARCH_CAP} are reachable")
+        if not halves:
+            return [(shard_query, total)]
+        planned = await asyncio.gather(*(self.plan_range(session, query, half_low, half_high) for half_low, half_high in halves))
+        return planned[0] + planned[1]
+
+    async def plan(self, session: aiohttp.ClientSession, query: str) -> List[Tuple[str, Optional[int]]]:
+        low, high = self.RANGES[self.dimension]
+        shards = await self.plan_range(session, query, low, high or date.today())
+        uncounted = sum(total is None for _, total in shards)
+        print(f"Planned {len(shards)} shards covering {sum(total or 0 for _, total in shards)} results "
+              f"with {self.count_requests} count requests" + (f", {uncounted} of them uncounted" if uncounted else ""))
+        return shards
@@ -0,0 +1,111 @@
+'''This module configures the HTTP connection pool shared by the extractors:
+1. SessionConfig holds the connector settings: total and per-host connection limits, keep-alive timeout,
+   DNS cache TTL, response compression and the total/connect/read timeouts of every request.
+2. Creates one TCPConnector lazily and shares it between every session opened from the same config,
+   so several extractors (roles, tokens) reuse the same keep-alive connections.
+3. Attaches an aiohttp TraceConfig that counts new and reused connections, DNS cache hits and
+   the time requests spent queued for a free connection, to size the pool for multi-token crawls.'''
+
+import aiohttp
+import time
+from typing import Optional
+
+class ConnectionMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.connect_time = 0.0
+        self.pool_waits = 0
+        self.pool_wait_time = 0.0
+        self.max_pool_wait = 0.0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self.on_request_start)
+        trace_config.on_connection_queued_start.append(self.on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(self.on_connection_queued_end)
+        trace_config.on_connection_create_start.append(self.on_connection_create_start)
+        trace_config.on_connection_create_end.append(self.on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self.on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self.on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self.on_dns_cache_miss)
+        return trace_config
+
+    async def on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def on_connection_queued_start(self, session, context, params):
+        context.queued_at = time.perf_counter()
+
+    async def on_connection_queued_end(self, session, context, params):
+        wait = time.perf_counter() - context.queued_at
+        self.pool_waits += 1
+        self.pool_wait_time += wait
+        self.max_pool_wait = max(self.max_pool_wait, wait)
+
+    async def on_connection_create_start(self, session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(self, session, context, params):
+        self.new_connections += 1
+        self.connect_time += time.perf_counter() - context.connect_started
+
+    async def on_connection_reuseconn(self, session, context, params):
+        self.reused_connections += 1
+
+    async def on_dns_cache_hit(self, session, context, params):
+        self.dns_cache_hits += 1
+
+    async def on_dns_cache_miss(self, session, context, params):
+        self.dns_cache_misses += 1
+
+    def report(self):
+        connections = self.new_connections + self.reused_connections
+        reuse_rate = self.reused_connections / connections if connections else 0.0
+        average_wait = self.pool_wait_time / self.pool_waits if self.pool_waits else 0.0
+        average_connect = self.connect_time / self.new_connections if self.new_connections else 0.0
+        print(f"Connections: {self.requests} requests, {self.new_connections} new connections "
+              f"({average_connect * 1000:.0f} ms avg to connect), {self.reused_connections} reused ({reuse_rate:.0%} reuse), "
+              f"DNS cache {self.dns_cache_hits} hits / {self.dns_cache_misses} misses")
+        print(f"Connection pool: {self.pool_waits} requests waited for a free connection, "
+              f"{self.pool_wait_time:.2f}s total, {average_wait * 1000:.0f} ms avg, {self.max_pool_wait * 1000:.0f} ms max")
+
+class SessionConfig:
+    def __init__(self, limit: int = 100, limit_per_host: int = 20, keepalive_timeout: float = 30.0, dns_cache_ttl: int = 300,
+                 compress: bool = True, total_timeout: float = 30.0, connect_timeout: Optional[float] = 10.0,
+                 read_timeout: Optional[float] = 20.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.compress = compress
+        self.total_timeout = total_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.metrics = ConnectionMetrics()
+        self.connector: Optional[aiohttp.TCPConnector] = None
+
+    def timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.total_timeout, sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+
+    def get_connector(self) -> aiohttp.TCPConnector:
+        # Created on first use because a connector must be built inside the running event loop.
+        if self.connector is None or self.connector.closed:
+            self.connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                                  keepalive_timeout=self.keepalive_timeout,
+                                                  use_dns_cache=self.dns_cache_ttl is not None, ttl_dns_cache=self.dns_cache_ttl)
+        return self.connector
+
+    def open_session(self) -> aiohttp.ClientSession:
+        # The session does not own the connector, so closing it keeps the pooled connections for the next session.
+        headers = {"Accept-Encoding": "gzip, deflate" if self.compress else "identity"}
+        return aiohttp.ClientSession(connector=self.get_connector(), connector_owner=False, timeout=self.timeout(),
+                                     headers=headers, auto_decompress=self.compress, trace_configs=[self.metrics.trace_config()])
+
+    async def close(self):
+        if self.connector is not None:
+            await self.connector.close()
+            self.connector = None
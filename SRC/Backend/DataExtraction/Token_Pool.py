@@ -0,0 +1,143 @@
+'''This module schedules GitHub API tokens based on their remaining rate-limit quota:
+1. Tracks remaining requests, limit and reset time for every token, separately per rate-limit resource (core, search, graphql).
+2. Updates that state from the X-RateLimit-* headers of every response.
+3. Hands each request the token with the most remaining quota, counting the cost of requests still in flight
+   against it so concurrent callers do not overshoot.
+   REST requests cost one unit; GraphQL queries reserve their estimated point cost.
+4. Sleeps only until the earliest reset when every token is drained for a resource.
+5. Builds per-request headers so no shared header dict is mutated under concurrency.
+6. Reports and exports per-token utilization statistics at the end of a run.'''
+
+import asyncio
+import csv
+import time
+from typing import Dict, List, Optional
+
+class TokenPool:
+    DEFAULT_LIMITS = {"core": 5000, "search": 30, "graphql": 5000}
+
+    def __init__(self, tokens: List[str]):
+        # Without tokens the pool still works, sending unauthenticated requests under a single slot.
+        self.tokens: List[Optional[str]] = list(tokens) or [None]
+        self.state: Dict[tuple, Dict] = {}
+        self.wait_time = 0.0
+
+    def _slot(self, index: int, resource: str) -> Dict:
+        key = (index, resource)
+        if key not in self.state:
+            limit = self.DEFAULT_LIMITS.get(resource, self.DEFAULT_LIMITS["core"])
+            self.state[key] = {
+                "limit": limit,
+                "remaining": limit,
+                "reset": 0.0,
+                "in_flight": 0,
+                "requests": 0,
+                "points": 0,
+                "rate_limited": 0
+            }
+        return self.state[key]
+
+    def headers(self, index: int) -> Dict[str, str]:
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.tokens[index]:
+            headers["Authorization"] = f"Bearer {self.tokens[index]}"
+        return headers
+
+    async def acquire(self, resource: str = "core", cost: int = 1) -> int:
+        while True:
+            now = time.time()
+            best_index = None
+            best_available = 0
+            for index in range(len(self.tokens)):
+                slot = self._slot(index, resource)
+                if slot["reset"] and slot["reset"] <= now:
+                    slot["remaining"] = slot["limit"]
+                    slot["reset"] = 0.0
+                available = slot["remaining"] - slot["in_flight"]
+                if available >= cost and available > best_available:
+                    best_index = index
+                    best_available = available
+
+            if best_index is not None:
+                slot = self._slot(best_index, resource)
+                slot["in_flight"] += cost
+                slot["requests"] += 1
+                slot["points"] += cost
+                return best_index
+
+            earliest_reset = min(self._slot(index, resource)["reset"] for index in range(len(self.tokens)))
+            wait = max(earliest_reset - now, 0) + 1 if earliest_reset else 1
+            print(f"All tokens exhausted for the {resource} quota. Sleeping {wait:.0f}s until the earliest reset...")
+            self.wait_time += wait
+            await asyncio.sleep(wait)
+
+    def release(self, index: int, resource: str, cost: int = 1):
+        slot = self._slot(index, resource)
+        slot["in_flight"] = max(slot["in_flight"] - cost, 0)
+
+    def update(self, index: int, resource: str, headers, status: int, cost: int = 1) -> bool:
+        self.release(index, resource, cost)
+        resource = headers.get("X-RateLimit-Resource", resource)
+        slot = self._slot(index, resource)
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        limit = headers.get("X-RateLimit-Limit")
+
+        if limit is not None:
+            slot["limit"] = int(limit)
+        if remaining is not None:
+            # Within one window the count only goes down, so an older response arriving late must not raise it.
+            if reset is not None and float(reset) > slot["reset"]:
+                slot["reset"] = float(reset)
+                slot["remaining"] = int(remaining)
+            else:
+                slot["remaining"] = min(slot["remaining"], int(remaining))
+
+        # Secondary rate limits (403/429 with quota left) are retried by the caller instead.
+        rate_limited = status in (403, 429) and remaining == "0"
+        if rate_limited:
+            slot["remaining"] = 0
+            slot["reset"] = float(reset) if reset is not None else time.time() + 60
+            slot["rate_limited"] += 1
+            print(f"Rate limit exceeded for token index {index} ({resource}).")
+        return rate_limited
+
+    def refund(self, index: int, resource: str, cost: int = 1):
+        self._slot(index, resource)["points"] -= cost
+
+    def stats(self) -> List[Dict]:
+        rows = []
+        for (index, resource), slot in sorted(self.state.items()):
+            token = self.tokens[index]
+            rows.append({
+                "token_index": index,
+                "token": f"...{token[-4:]}" if token else "unauthenticated",
+                "resource": resource,
+                "requests": slot["requests"],
+                "points": slot["points"],
+                "limit": slot["limit"],
+                "remaining": slot["remaining"],
+                "utilization": round(slot["points"] / slot["limit"], 4) if slot["limit"] else 0,
+                "rate_limited": slot["rate_limited"],
+                "reset": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(slot["reset"])) if slot["reset"] else ""
+            })
+        return rows
+
+    def report(self):
+        print("\nToken utilization:")
+        for row in self.stats():
+            print(f"  Token {row['token_index']} ({row['token']}) [{row['resource']}]: {row['requests']} requests, "
+                  f"{row['remaining']}/{row['limit']} remaining, {row['rate_limited']} rate-limited responses")
+        if self.wait_time:
+            print(f"  Waited {self.wait_time:.0f}s for rate-limit resets")
+
+    def export_stats(self, path: str):
+        rows = self.stats()
+        with open(path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=[
+                "token_index", "token", "resource", "requests", "points", "limit", "remaining",
+                "utilization", "rate_limited", "reset"
+            ])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Token statistics saved to {path}")
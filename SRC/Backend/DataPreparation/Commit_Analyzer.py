@@ -1,18 +1,34 @@
 '''This script analyzes GitHub commit messages to evaluate candidates' expertise:
 
-1. Loads user data from a CSV file and standardizes job role names.  
+1. Loads user data from a CSV, Parquet or Arrow IPC file and standardizes job role names.  
 2. Filters relevant roles (Web Developer, Java Developer) for analysis.   
-3. Checks commit history for each user by reading corresponding commit files.   
-4. Processes commit messages using TF-IDF scoring based on predefined keywords for each job role.   
-5. Computes a commit score reflecting the relevance of a user's commits to their job role.   
+3. Checks commit history for each user by reading only the commit_message column of the corresponding commit file,
+   found by listing the commit directory once, or of a commit store, which is read once for all users:
+   a partitioned store written by Commit_Store.py, or a single Parquet or Arrow IPC store written by Commit_Harvester.py.
+   Parquet stores are read with the users' filter pushed down, and the table is grouped by username.
+4. Processes commit messages using TF-IDF scoring based on predefined keywords for each job role,
+   fitted once per role over the commits of all its users (see Role_Scorer.py).
+5. Computes a commit score reflecting the relevance of a user's commits to their job role, comparable across the role's users.
 6. Logs the processing steps and handles errors during TF-IDF computation.   
 7. Updates the dataset with computed commit scores and additional feature columns.   
-8. Saves the processed data to a new CSV file for further use.'''
+8. Saves the processed data to a new file in the input's format for further use.
+9. Imports pandas and scikit-learn only when a table is read or scored, so importing the module is cheap
+   and nothing runs until process_final_data is called or the script is started.
+10. With several workers, shards the users across a process pool: each worker reads its users' commits and sends back
+   only their keyword counts, the parent fits each role's TF-IDF weights over all counts, so scores and log order
+   are the same as in a serial run (measure the speedup with Scoring_Benchmark.py --speedup).
 
+Run it on a final data file and the directory of per-user commit files, or a commit store:
+    python Commit_Analyzer.py --final-data final_data.csv --commit-dir combined_commit_message/
+    python Commit_Analyzer.py --final-data final_data.csv --commit-dir commit_store/ --workers 8'''
+
+import argparse
 import os
-import pandas as pd
 from collections import Counter, defaultdict
-from sklearn.feature_extraction.text import TfidfVectorizer
+from functools import lru_cache
+
+from Commit_Store import CommitStore
+from Role_Scorer import RoleScorer
 
 class CommitAnalyzer:
     ROLE_KEYWORDS = {
@@ -87,14 +103,43 @@ class CommitAnalyzer:
         print(message)
 
     @staticmethod
-    def calculate_tfidf_score(commit_messages, keywords):
+    def read_table(path, columns=None, dtype=None):
+        import pandas as pd
+
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path, columns=columns)
+        if path.endswith((".arrow", ".arrows")):
+            import pyarrow as pa
+
+            batches = []
+            with pa.OSFile(path, mode="rb") as source:
+                reader = pa.ipc.open_stream(source)
+                # The harvester writes an Arrow IPC stream batch by batch; a crash can cut it inside the last batch.
+                while True:
+                    try:
+                        batches.append(reader.read_next_batch())
+                    except StopIteration:
+                        break
+                    except (pa.ArrowInvalid, OSError) as e:
+                        print(f"Stopped reading {path} at a damaged batch ({e})")
+                        break
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+            return table.select(columns).to_pandas() if columns else table.to_pandas()
+        return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+    @staticmethod
+    def write_table(df, path):
         
-        if not keywords:
-            return [0] * len(commit_messages)
+        if path.endswith(".parquet"):
+            df.to_parquet(path, index=False)
+        elif path.endswith((".arrow", ".arrows")):
+            import pyarrow as pa
 
-        tfidf_vectorizer = TfidfVectorizer(vocabulary=[kw.lower() for kw in keywords], lowercase=True)
-        tfidf_matrix = tfidf_vectorizer.fit_transform(commit_messages)
-        return tfidf_matrix.sum(axis=1)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(path, mode="wb") as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            df.to_csv(path, index=False)
 
     @staticmethod
     def normalize_job_role(role):
@@ -109,12 +154,51 @@ class CommitAnalyzer:
         else:
             return role.title()
 
-    def process_final_data(self, final_data_path, commit_files_dir):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def role_scorer(job_role):
+        # Built once per role in each worker process; counting only reads its vocabulary.
+        return RoleScorer(CommitAnalyzer.ROLE_KEYWORDS.get(job_role, []))
+
+    @staticmethod
+    def count_user_commits(task):
+        index, username, job_role, commit_source, from_store = task
+        if commit_source is None:
+            missing = f"No commits in the store for {username}" if from_store else f"No commit file for {username}"
+            return index, job_role, [f"{missing} → Skipping..."], None
+        if from_store:
+            log_lines = [f"Processing stored commits for {username}"]
+            messages = commit_source
+        else:
+            log_lines = [f"Processing commit file for {username}"]
+            commits_df = CommitAnalyzer.read_table(commit_source, columns=["commit_message"], dtype={"commit_message": str})
+            messages = commits_df["commit_message"].fillna("").astype(str).tolist()
+
+        if not any(message.strip() for message in messages):
+            log_lines.append(f"No valid commit messages for {username} → Skipping...")
+            return index, job_role, log_lines, None
+
+        # Only the sparse keyword counts go back to the parent, not the messages.
+        return index, job_role, log_lines, CommitAnalyzer.role_scorer(job_role).count(messages)
+
+    @staticmethod
+    def map_users(function, tasks, workers):
+        if workers <= 1 or len(tasks) <= 1:
+            yield from map(function, tasks)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Chunks of users per round trip keep the inter-process overhead low; map yields results in task order.
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(function, tasks, chunksize=chunksize)
+
+    def process_final_data(self, final_data_path, commit_files_dir, workers=1):
         
         self.log_message("\nStarting commit analysis...")
 
         
-        users_df = pd.read_csv(final_data_path)
+        users_df = self.read_table(final_data_path)
         users_df["username"] = users_df["username"].str.strip()
         users_df["job role"] = users_df["job role"].apply(self.normalize_job_role)
 
@@ -132,46 +216,67 @@ class CommitAnalyzer:
         users_df["feature_2"] = 0
         users_df["feature_3"] = 0
 
-        users_to_keep = []
+        store_df = None
+        if CommitStore.is_store(commit_files_dir) or commit_files_dir.endswith(".parquet"):
+            # Only the rows of the users being scored are read; the filter is pushed down to the store.
+            store_df = CommitStore.read_messages(commit_files_dir, users_df["username"].tolist())
+        elif os.path.isfile(commit_files_dir):
+            store_df = self.read_table(commit_files_dir, columns=["username", "commit_message"], dtype={"commit_message": str})
 
+        if store_df is not None:
+            store_df["commit_message"] = store_df["commit_message"].fillna("").astype(str)
+            commit_sources = {username: messages.tolist() for username, messages in store_df.groupby("username", sort=False)["commit_message"]}
+        else:
+            commit_sources = CommitStore.list_commit_files(commit_files_dir)
+
+        tasks = []
         for index, row in users_df.iterrows():
             username = row["username"]
-            job_role = row["job role"]
+            # A commit file is read by the worker; stored messages are already in memory; None marks a user without commits.
+            tasks.append((index, username, row["job role"], commit_sources.get(username), store_df is not None))
 
-            commit_file = os.path.join(commit_files_dir, f"{username}_commit_details.csv")
-            if not os.path.exists(commit_file):
-                self.log_message(f"No commit file for {username} → Skipping...")
-                continue
+        role_counts = defaultdict(dict)
+        for index, job_role, log_lines, counts in self.map_users(self.count_user_commits, tasks, workers):
+            # Results arrive in user order whatever the number of workers, so the log reads as in a serial run.
+            for line in log_lines:
+                self.log_message(line)
+            if counts is not None:
+                role_counts[job_role][index] = counts
 
-            self.log_message(f"Processing commit file for {username}")
-
-            commits_df = pd.read_csv(commit_file)
-            commits_df["commit_message"] = commits_df["commit_message"].fillna("").astype(str)
-
-            if commits_df["commit_message"].str.strip().eq("").all():
-                self.log_message(f"No valid commit messages for {username} → Skipping...")
-                continue
-
-            keywords = self.ROLE_KEYWORDS.get(job_role, [])
+        users_to_keep = set()
+        for job_role, user_counts in sorted(role_counts.items()):
+            indexes = list(user_counts)
             try:
-                scores = self.calculate_tfidf_score(commits_df["commit_message"].tolist(), keywords)
-                users_df.at[index, self.COMMIT_SCORE_COLUMN] = scores.sum()
-                self.log_message(f"Computed TF-IDF score for {username}: {scores.sum()}")
+                scorer = RoleScorer(self.ROLE_KEYWORDS.get(job_role, []))
+                scores = scorer.fit_score_counts(*RoleScorer.stack_counts(list(user_counts.values())))
             except Exception as e:
-                self.log_message(f"Error in TF-IDF computation for {username}: {str(e)}")
+                self.log_message(f"Error in TF-IDF computation for {job_role}: {str(e)}")
                 continue
+            self.log_message(f"Scored {len(indexes)} {job_role} users with {len(scorer.vocabulary)} keywords")
+            for index, score in zip(indexes, scores):
+                users_df.at[index, self.COMMIT_SCORE_COLUMN] = score
+                self.log_message(f"Computed TF-IDF score for {users_df.at[index, 'username']}: {score}")
+            users_to_keep.update(indexes)
 
-            users_to_keep.append(index)
-
-        users_df = users_df.loc[users_to_keep]
-        output_file = final_data_path.replace(".csv", "_final_updated.csv")
-        users_df.to_csv(output_file, index=False)
+        users_df = users_df.loc[[index for index in users_df.index if index in users_to_keep]]
+        base_path, extension = os.path.splitext(final_data_path)
+        output_file = f"{base_path}_final_updated{extension}"
+        self.write_table(users_df, output_file)
         self.log_message(f"\nProcessing complete. Updated data saved to {output_file}")
 
 
 
-final_data_path = "/home/ashwin_jayan/EXTRACT/final_data.csv"
-commit_files_dir = "/home/ashwin_jayan/EXTRACT/combined_commit_message/"
+FINAL_DATA_PATH = "/home/ashwin_jayan/EXTRACT/final_data.csv"
+COMMIT_FILES_DIR = "/home/ashwin_jayan/EXTRACT/combined_commit_message/"
+WORKERS = os.cpu_count() or 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score candidates' commit messages against the keywords of their job role.")
+    parser.add_argument("--final-data", default=FINAL_DATA_PATH, help="CSV or Parquet file with username and job role columns.")
+    parser.add_argument("--commit-dir", default=COMMIT_FILES_DIR,
+                        help="Directory with the {username}_commit_details files, or a commit store written by Commit_Store.py or Commit_Harvester.py.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Processes reading and counting users' commits; 1 runs serially.")
+    args = parser.parse_args()
 
-analyzer = CommitAnalyzer()
-analyzer.process_final_data(final_data_path, commit_files_dir)
+    analyzer = CommitAnalyzer()
+    analyzer.process_final_data(args.final_data, args.commit_dir, args.workers)
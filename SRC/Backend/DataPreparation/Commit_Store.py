@@ -0,0 +1,166 @@
+'''This script consolidates the per-user commit files into one partitioned Parquet commit store:
+1. Lists the {username}_commit_details files of a commit directory once, preferring Parquet over CSV like the analyzer,
+   and reads only the header of each file to build one string schema holding every column any of them has.
+2. Hashes each username into one of a fixed number of buckets and writes the bucket's commits, sorted by username,
+   to user_bucket={bucket}/part-0.parquet, so the store has a few large files instead of one small file per user.
+3. Records the bucket count in the schema metadata, so a reader can turn the usernames it needs into the buckets to open.
+4. read_messages reads only the username and commit_message columns, pushing the username filter down to the store:
+   whole buckets are pruned by partition, and row groups inside a bucket by their username statistics.
+   A single Parquet store written by Commit_Harvester.py is read the same way, without bucket pruning.
+5. Writes the store to a temporary directory that replaces the output once every bucket is complete;
+   when no commit file could be read, the previous store is kept.
+
+Convert a directory of per-user commit files once, then analyze the store:
+    python Commit_Store.py --commit-dir combined_commit_message/ --output commit_store/ --buckets 32
+    python Commit_Analyzer.py --final-data final_data.csv --commit-dir commit_store/'''
+
+import argparse
+import os
+import shutil
+import time
+import zlib
+
+class CommitStore:
+    BUCKET_COLUMN = "user_bucket"
+    BUCKET_COUNT_KEY = b"user_buckets"
+    FILE_SUFFIXES = ["_commit_details.parquet", "_commit_details.csv"]
+
+    @staticmethod
+    def bucket_of(username, buckets):
+        # crc32 rather than hash(), which is salted per process and would move users between runs.
+        return zlib.crc32(username.encode("utf-8")) % buckets
+
+    @classmethod
+    def is_store(cls, path):
+        return os.path.isdir(path) and any(name.startswith(cls.BUCKET_COLUMN + "=") for name in os.listdir(path))
+
+    @classmethod
+    def list_commit_files(cls, commit_dir):
+        commit_files = {}
+        # One directory listing instead of an existence probe per user and format.
+        for suffix in reversed(cls.FILE_SUFFIXES):
+            for name in os.listdir(commit_dir):
+                if name.endswith(suffix):
+                    commit_files[name[:-len(suffix)]] = os.path.join(commit_dir, name)
+        return dict(sorted(commit_files.items()))
+
+    @staticmethod
+    def read_columns(path):
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        if path.endswith(".parquet"):
+            return pq.read_schema(path).names
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    @staticmethod
+    def read_commit_file(path, columns):
+        import pandas as pd
+
+        if path.endswith(".parquet"):
+            commits_df = pd.read_parquet(path)
+        else:
+            commits_df = pd.read_csv(path, dtype=str)
+        # Every column is stored as a string, missing values and columns stay null.
+        return commits_df.reindex(columns=columns).astype("string")
+
+    @classmethod
+    def convert(cls, commit_dir, output_dir, buckets=32, row_group_size=65536):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        start_time = time.perf_counter()
+        commit_files = cls.list_commit_files(commit_dir)
+        if not commit_files:
+            print(f"No commit files in {commit_dir}; {output_dir} is left unchanged")
+            return 0
+        columns = []
+        for username, path in list(commit_files.items()):
+            try:
+                file_columns = cls.read_columns(path)
+            except Exception as e:
+                print(f"Could not read {path} ({e}) → Skipping...")
+                del commit_files[username]
+                continue
+            columns.extend(column for column in file_columns if column not in columns and column != "username")
+        schema = pa.schema([("username", pa.string())] + [(column, pa.string()) for column in columns],
+                           metadata={cls.BUCKET_COUNT_KEY: str(buckets).encode()})
+
+        temporary_dir = output_dir.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        writers = {}
+        pending = {}
+        pending_rows = {}
+        commits_written = 0
+
+        def flush(bucket):
+            commits_df = pd.concat(pending.pop(bucket), ignore_index=True)
+            pending_rows.pop(bucket)
+            if bucket not in writers:
+                bucket_dir = os.path.join(temporary_dir, f"{cls.BUCKET_COLUMN}={bucket}")
+                os.makedirs(bucket_dir)
+                writers[bucket] = pq.ParquetWriter(os.path.join(bucket_dir, "part-0.parquet"), schema, compression="zstd")
+            writers[bucket].write_table(pa.Table.from_pandas(commits_df, schema=schema, preserve_index=False),
+                                        row_group_size=row_group_size)
+
+        try:
+            # Users are visited in username order, so every bucket file is sorted by username.
+            for username, path in commit_files.items():
+                try:
+                    commits_df = cls.read_commit_file(path, columns)
+                except Exception as e:
+                    print(f"Could not read {path} ({e}) → Skipping...")
+                    continue
+                commits_df.insert(0, "username", username)
+                bucket = cls.bucket_of(username, buckets)
+                pending.setdefault(bucket, []).append(commits_df)
+                pending_rows[bucket] = pending_rows.get(bucket, 0) + len(commits_df)
+                commits_written += len(commits_df)
+                if pending_rows[bucket] >= row_group_size:
+                    flush(bucket)
+            for bucket in list(pending):
+                flush(bucket)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        if not writers:
+            # Nothing could be read, so there is no new store to replace the previous one with.
+            print(f"No readable commit files in {commit_dir}; {output_dir} is left unchanged")
+            return 0
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(temporary_dir, output_dir)
+        elapsed = time.perf_counter() - start_time
+        print(f"Converted {commits_written} commits of {len(commit_files)} users from {commit_dir} "
+              f"into {len(writers)} buckets of {output_dir} in {elapsed:.1f}s")
+        return commits_written
+
+    @classmethod
+    def read_messages(cls, path, usernames=None):
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        row_filter = None
+        if usernames is not None:
+            usernames = sorted(set(usernames))
+            row_filter = ds.field("username").isin(usernames)
+            metadata = dataset.schema.metadata or {}
+            if cls.BUCKET_COLUMN in dataset.schema.names and cls.BUCKET_COUNT_KEY in metadata:
+                buckets = int(metadata[cls.BUCKET_COUNT_KEY])
+                user_buckets = sorted({cls.bucket_of(username, buckets) for username in usernames})
+                row_filter = ds.field(cls.BUCKET_COLUMN).isin(user_buckets) & row_filter
+        return dataset.to_table(columns=["username", "commit_message"], filter=row_filter).to_pandas()
+
+
+COMMIT_FILES_DIR = "/home/ashwin_jayan/EXTRACT/combined_commit_message/"
+COMMIT_STORE_DIR = "/home/ashwin_jayan/EXTRACT/commit_store/"
+BUCKETS = 32
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a directory of per-user commit files into one partitioned Parquet commit store.")
+    parser.add_argument("--commit-dir", default=COMMIT_FILES_DIR, help="Directory with the {username}_commit_details files.")
+    parser.add_argument("--output", default=COMMIT_STORE_DIR, help="Store directory to write; replaced if it exists.")
+    parser.add_argument("--buckets", type=int, default=BUCKETS, help="Username hash buckets, one Parquet file each.")
+    args = parser.parse_args()
+    CommitStore.convert(args.commit_dir, args.output, args.buckets)
@@ -0,0 +1,118 @@
+'''This module scores commit messages against the keywords of one job role:
+1. Builds the vocabulary once per role from its keyword list, lowercased, tokenized like the messages and without duplicates.
+   Tokens keep inner dots, slashes, hyphens and trailing + or #, so socket.io, ci/cd, scikit-learn and c# stay whole.
+   Keywords of several words ("spring boot", "core web vitals") are matched too, unlike with the default unigram analyzer.
+2. PhraseMatcher walks a token trie of the vocabulary (Aho-Corasick over tokens), so one pass over a message's tokens
+   yields every keyword occurrence, and TF-IDF only ever counts vocabulary terms instead of all n-grams.
+3. Counts keyword occurrences per message with the fixed vocabulary; counting needs no fitting,
+   so worker processes can count their share of the candidates and send back only sparse count matrices.
+4. Fits the TF-IDF weights once over the counts of every candidate of the role,
+   so a keyword's weight is the same for all candidates and their scores are comparable.
+5. Weighs the counts of all candidates in one batched sparse matrix and adds up each candidate's rows
+   into one commit score per candidate. fit_score counts, fits and weighs in the same pass over the messages;
+   fit and score apart let a scorer fitted on one corpus score other candidates.'''
+
+import re
+
+TOKEN_PATTERN = re.compile(r"[\w+#]+(?:[./-][\w+#]+)*")
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+class PhraseMatcher:
+    # A plain class rather than a closure, so a fitted scorer can be pickled to worker processes.
+    def __init__(self, vocabulary):
+        self.trie = {}
+        for term in vocabulary:
+            node = self.trie
+            for token in term.split(" "):
+                node = node.setdefault(token, {})
+            node[None] = term
+
+    def __call__(self, text):
+        tokens = tokenize(text)
+        matches = []
+        for start, token in enumerate(tokens):
+            node = self.trie.get(token)
+            position = start + 1
+            while node is not None:
+                term = node.get(None)
+                if term is not None:
+                    matches.append(term)
+                if position == len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return matches
+
+class RoleScorer:
+    def __init__(self, keywords):
+        terms = (" ".join(tokenize(keyword)) for keyword in keywords)
+        self.vocabulary = list(dict.fromkeys(term for term in terms if term))
+        self.transformer = None
+        self.counter = None
+
+    def new_counter(self):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        return CountVectorizer(vocabulary=self.vocabulary, analyzer=PhraseMatcher(self.vocabulary))
+
+    def new_vectorizer(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        return TfidfVectorizer(vocabulary=self.vocabulary, analyzer=PhraseMatcher(self.vocabulary))
+
+    def count(self, messages):
+        import scipy.sparse
+
+        # The vocabulary is fixed, so counting needs no fitting and any process can count any candidate's messages.
+        if not self.vocabulary or not messages:
+            return scipy.sparse.csr_matrix((len(messages), len(self.vocabulary)))
+        if self.counter is None:
+            # Built once per scorer, not once per candidate: the trie and vocabulary lookup are the same for every call.
+            self.counter = self.new_counter()
+        return self.counter.transform(messages)
+
+    def fit(self, messages):
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        if self.vocabulary:
+            self.transformer = TfidfTransformer().fit(self.count(messages))
+        return self
+
+    def score(self, user_messages):
+        return self.score_counts(*self.count_users(user_messages))
+
+    def fit_score(self, user_messages):
+        return self.fit_score_counts(*self.count_users(user_messages))
+
+    def count_users(self, user_messages):
+        messages = [message for messages in user_messages for message in messages]
+        return self.count(messages), [len(messages) for messages in user_messages]
+
+    @staticmethod
+    def stack_counts(user_counts):
+        import scipy.sparse
+
+        # Per-candidate counts from worker processes, stacked in candidate order like a batched count.
+        return scipy.sparse.vstack(user_counts, format="csr"), [counts.shape[0] for counts in user_counts]
+
+    def score_counts(self, counts, message_counts):
+        return self.sum_by_user(counts, message_counts, lambda counts: self.transformer.transform(counts))
+
+    def fit_score_counts(self, counts, message_counts):
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        if self.vocabulary:
+            self.transformer = TfidfTransformer()
+        return self.sum_by_user(counts, message_counts, lambda counts: self.transformer.fit_transform(counts))
+
+    def sum_by_user(self, counts, message_counts, weigh):
+        import numpy as np
+
+        if self.transformer is None or not sum(message_counts):
+            return np.zeros(len(message_counts))
+        message_scores = np.asarray(weigh(counts).sum(axis=1)).ravel()
+        # Every message belongs to the candidate at the same position of message_counts.
+        owners = np.repeat(np.arange(len(message_counts)), message_counts)
+        return np.bincount(owners, weights=message_scores, minlength=len(message_counts))
@@ -0,0 +1,124 @@
+'''This script compares the keyword matching of the commit scoring before and after phrase-aware tokenization:
+1. Uses real commit messages from a commit store or commit file, or generates synthetic ones from each role's keywords,
+   with mixed case, punctuation and multi-word keywords, as they appear in commit messages.
+2. Scores the messages with the previous unigram TF-IDF vectorizer (default tokenizer, one-word n-grams)
+   and with the phrase-aware token-trie vectorizer of RoleScorer, repeating each pass and keeping the fastest one.
+3. Reports, per role, the throughput in messages per second, how many keywords matched at least once,
+   how many keywords can never match under each tokenization, and how many messages matched any keyword.
+4. With --speedup, runs the whole commit analysis of a final data file with 1 to --max-workers processes,
+   and reports the wall time, speedup and parallel efficiency per worker count, and whether the scores match the serial run.
+
+Benchmark on synthetic messages, or on a commit store written by Commit_Harvester.py:
+    python Scoring_Benchmark.py --messages 50000
+    python Scoring_Benchmark.py --commits commit_store.parquet
+
+Measure the speedup curve of the process-pool commit analysis:
+    python Scoring_Benchmark.py --speedup --final-data final_data.csv --commit-dir combined_commit_message/ --max-workers 8'''
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+from Commit_Analyzer import CommitAnalyzer
+from Commit_Store import CommitStore
+from Role_Scorer import RoleScorer
+
+FILLER_WORDS = ["fix", "add", "update", "refactor", "remove", "bump", "tests", "docs", "cleanup", "handler", "config", "build"]
+
+def make_messages(keywords, count, seed=0):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(rng.randrange(3, 9))]
+        for keyword in rng.sample(keywords, rng.randrange(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), keyword.title() if rng.random() < 0.3 else keyword)
+        messages.append(" ".join(words) + rng.choice(["", ".", "!", " (#12)"]))
+    return messages
+
+def unigram_vectorizer(keywords):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    # The scoring before phrase-aware tokenization: default token pattern and single-word n-grams.
+    return TfidfVectorizer(vocabulary=list(dict.fromkeys(keyword.lower() for keyword in keywords)), lowercase=True)
+
+def unreachable_keywords(vectorizer):
+    analyzer = vectorizer.build_analyzer()
+    # A keyword can only ever match if analyzing the keyword itself yields it as a term.
+    return sum(term not in analyzer(term) for term in vectorizer.vocabulary)
+
+def measure(vectorizer, messages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        matrix = vectorizer.fit_transform(messages)
+        best = min(best, time.perf_counter() - start_time)
+    return {
+        "messages_per_sec": len(messages) / best,
+        "keywords_matched": int((matrix.getnnz(axis=0) > 0).sum()),
+        "keywords": len(vectorizer.vocabulary),
+        "unreachable": unreachable_keywords(vectorizer),
+        "messages_matched": int((matrix.getnnz(axis=1) > 0).sum())
+    }
+
+def benchmark(messages_by_role, repeat):
+    print(f"\n{'role':<16}{'scorer':<9}{'msgs/sec':>11}{'matched kw':>12}{'unreachable':>13}{'msgs matched':>14}")
+    for role, messages in messages_by_role.items():
+        keywords = CommitAnalyzer.ROLE_KEYWORDS[role]
+        for name, vectorizer in (("unigram", unigram_vectorizer(keywords)), ("phrase", RoleScorer(keywords).new_vectorizer())):
+            result = measure(vectorizer, messages, repeat)
+            print(f"{role:<16}{name:<9}{result['messages_per_sec']:>11.0f}"
+                  f"{result['keywords_matched']:>6}/{result['keywords']:<5}{result['unreachable']:>13}"
+                  f"{result['messages_matched']:>8}/{len(messages)}")
+
+def run_analysis(final_data_path, commit_files_dir, workers):
+    # The per-user log lines would dominate the measured time, so they go nowhere.
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        CommitAnalyzer().process_final_data(final_data_path, commit_files_dir, workers)
+        elapsed = time.perf_counter() - start_time
+    base_path, extension = os.path.splitext(final_data_path)
+    scores = CommitAnalyzer.read_table(f"{base_path}_final_updated{extension}")[CommitAnalyzer.COMMIT_SCORE_COLUMN]
+    return elapsed, scores.tolist()
+
+def speedup_curve(final_data_path, commit_files_dir, max_workers, repeat):
+    CommitAnalyzer.LOG_FILE = os.devnull
+    print(f"\n{'workers':>7}{'seconds':>10}{'speedup':>9}{'efficiency':>12}{'same scores':>13}")
+    serial_time, serial_scores = None, None
+    for workers in range(1, max_workers + 1):
+        runs = [run_analysis(final_data_path, commit_files_dir, workers) for _ in range(repeat)]
+        elapsed, scores = min(runs, key=lambda run: run[0])
+        if serial_time is None:
+            serial_time, serial_scores = elapsed, scores
+        speedup = serial_time / elapsed
+        print(f"{workers:>7}{elapsed:>10.2f}{speedup:>8.2f}x{speedup / workers:>11.0%}{str(scores == serial_scores):>13}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare unigram and phrase-aware keyword matching of commit messages.")
+    parser.add_argument("--commits", help="Commit store or commit file with a commit_message column; synthetic messages if omitted.")
+    parser.add_argument("--messages", type=int, default=20000, help="Synthetic messages generated per role.")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per scorer or worker count; the fastest pass is reported.")
+    parser.add_argument("--speedup", action="store_true", help="Measure the commit analysis with 1 to --max-workers processes.")
+    parser.add_argument("--final-data", help="Final data file analyzed by --speedup.")
+    parser.add_argument("--commit-dir", help="Commit file directory or commit store analyzed by --speedup.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count measured by --speedup.")
+    args = parser.parse_args()
+
+    if args.speedup:
+        if not args.final_data or not args.commit_dir:
+            parser.error("--speedup needs --final-data and --commit-dir")
+        speedup_curve(args.final_data, args.commit_dir, args.max_workers, args.repeat)
+    else:
+        if args.commits:
+            if CommitStore.is_store(args.commits):
+                commits_df = CommitStore.read_messages(args.commits)
+            else:
+                commits_df = CommitAnalyzer.read_table(args.commits, columns=["commit_message"], dtype={"commit_message": str})
+            messages = commits_df["commit_message"].fillna("").astype(str).tolist()
+            messages_by_role = {role: messages for role in CommitAnalyzer.ROLE_KEYWORDS}
+        else:
+            messages_by_role = {role: make_messages(keywords, args.messages, seed)
+                                for seed, (role, keywords) in enumerate(CommitAnalyzer.ROLE_KEYWORDS.items())}
+        benchmark(messages_by_role, args.repeat)